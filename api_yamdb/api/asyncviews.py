@@ -0,0 +1,66 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+@functools.lru_cache(maxsize=None)
+def get_read_executor():
+    """Пул потоков для запросов на чтение: не больше ASYNC_READ_WORKERS."""
+    return ThreadPoolExecutor(
+        max_workers=settings.ASYNC_READ_WORKERS,
+        thread_name_prefix='api-read',
+    )
+
+
+def render_read(view, request, *args, **kwargs):
+    """
+    Синхронная часть запроса на чтение в потоке пула: view и рендеринг
+    ответа. Соединение с базой у каждого потока своё, поэтому закрываем
+    его по правилам CONN_MAX_AGE, как это делает обработчик запроса.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Асинхронная обёртка над view вьюсета. Без неё ASGI-обработчик
+    Django выполняет все синхронные view в одном общем потоке,
+    и медленные запросы ждут друг друга. Запросы на чтение уходят
+    в ограниченный пул потоков, изменяющие по-прежнему выполняются
+    в общем потоке: транзакции и сигналы работают как раньше.
+    """
+    write = sync_to_async(view, thread_sensitive=True)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await write(request, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            get_read_executor(),
+            functools.partial(render_read, view, request, *args, **kwargs),
+        )
+
+    return async_view
+
+
+class AsyncReadMixin:
+    """При ASYNC_READ_VIEWS вьюсет отдаёт асинхронные view."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS:
+            return view
+        return async_read_view(view)
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import time
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django_filters.filters import BaseCSVFilter
+from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
+from reviews.models import Category, Genre
+
+VERSION_KEY = 'catalog:version:{}'
+RESPONSE_KEY = 'catalog:response:{}:{}'
+
+# Версии сущностей каталога. Ключ ответа включает версии всего,
+# из чего он собран, поэтому запись не удаляет старые ответы,
+# а просто делает их ключи недостижимыми.
+TITLES = 'titles'
+TITLE_DETAILS = 'title_details'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+
+
+def get_catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def is_catalog_cache_shared():
+    """
+    Видят ли версии из кэша каталога все процессы. LocMem-кэш
+    у каждого процесса свой, и изменения других процессов
+    в нём не отражаются, а DummyCache версий не хранит вовсе.
+    """
+    return not isinstance(get_catalog_cache(), (LocMemCache, DummyCache))
+
+
+def title_entity(pk):
+    return f'title:{pk}'
+
+
+def new_version():
+    """
+    Версия — время в наносекундах: она растёт от записи к записи
+    и не повторяет старые значения, даже если ключ версии вытеснен
+    из кэша раньше сохранённых ответов.
+    """
+    return time.time_ns()
+
+
+def bump_versions(*entities):
+    get_catalog_cache().set_many(
+        {VERSION_KEY.format(entity): new_version() for entity in entities},
+        timeout=None,
+    )
+
+
+def bump_versions_on_commit(*entities):
+    """
+    Меняем версии после фиксации транзакции. Иначе параллельный
+    запрос успел бы закэшировать ещё не зафиксированные строки
+    под новой версией.
+    """
+    transaction.on_commit(partial(bump_versions, *entities))
+
+
+def get_versions(*entities):
+    cache = get_catalog_cache()
+    keys = [VERSION_KEY.format(entity) for entity in entities]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+class CatalogCacheMixin:
+    """
+    Кэшируем ответы list и retrieve. Ключ строится из нормализованных
+    параметров запроса и версий сущностей, из которых собран ответ.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, (TITLES, CATEGORIES, GENRES),
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self.get_cached_response(
+            super().retrieve,
+            (TITLE_DETAILS, title_entity(lookup), CATEGORIES, GENRES),
+            request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, entities, request, *args,
+                            **kwargs):
+        cache = get_catalog_cache()
+        key = self.get_response_cache_key(request, get_versions(*entities))
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+    def get_response_cache_key(self, request, versions):
+        payload = json.dumps(
+            [
+                request.get_host(),
+                request.path,
+                self.normalize_query_params(request),
+                versions,
+            ],
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return RESPONSE_KEY.format(self.action, digest)
+
+    def normalize_query_params(self, request):
+        """
+        Параметры фильтра приводим к каноническому виду: как и фильтр,
+        берём последнее значение, пустые отбрасываем, списки через запятую
+        сортируем. Остальные параметры (страница, курсор) оставляем как есть.
+        """
+        filters = getattr(self.filterset_class, 'base_filters', {})
+        params = []
+        for name in sorted(request.query_params):
+            values = request.query_params.getlist(name)
+            if name in filters:
+                value = values[-1]
+                if isinstance(filters[name], BaseCSVFilter):
+                    value = ','.join(sorted(set(value.split(',')) - {''}))
+                if not value:
+                    continue
+                values = [value]
+            params.append([name, values])
+        return params
+
+
+# modified — время последнего изменения строк в наносекундах
+# (None, если версию негде хранить), loaded_at — когда строки прочитаны.
+ReferenceSnapshot = namedtuple(
+    'ReferenceSnapshot', ('version', 'modified', 'loaded_at', 'rows', 'slugs')
+)
+
+
+class ReferenceCache:
+    """
+    Небольшой справочник (категории, жанры) в памяти процесса.
+    Строки перечитываются из базы, когда версия сущности в кэше
+    каталога изменилась, и не реже чем раз в REFERENCE_CACHE_TIMEOUT
+    секунд: так изменения других процессов видны и без общего кэша
+    (см. is_catalog_cache_shared), но с задержкой.
+    """
+
+    def __init__(self, model, entity):
+        self.model = model
+        self.entity = entity
+        self.clear()
+
+    def clear(self):
+        self._snapshot = ReferenceSnapshot(None, None, None, [], {})
+
+    def get_rows(self):
+        """Все объекты справочника в порядке id."""
+        return self.get_snapshot().rows
+
+    def get_by_slug(self, slug):
+        return self.get_snapshot().slugs.get(slug)
+
+    def get_snapshot(self):
+        version = get_versions(self.entity)[0]
+        snapshot = self._snapshot
+        if version is not None and snapshot.version == version and (
+            time.monotonic() - snapshot.loaded_at
+            < settings.REFERENCE_CACHE_TIMEOUT
+        ):
+            return snapshot
+        rows = list(self.model.objects.order_by('id'))
+        if version is None:
+            # Кэш не хранит версий: отдаём строки из базы, не запоминая.
+            return ReferenceSnapshot(
+                None, None, None, rows, {row.slug: row for row in rows}
+            )
+        modified = version
+        if snapshot.version == version:
+            # Копия устарела по времени: если строки изменил другой
+            # процесс, считаем их изменёнными сейчас, иначе клиенты
+            # получали бы 304 на прежний список.
+            modified = snapshot.modified
+            if self.get_values(rows) != self.get_values(snapshot.rows):
+                modified = max(new_version(), modified + 1)
+        snapshot = ReferenceSnapshot(
+            version, modified, time.monotonic(), rows,
+            {row.slug: row for row in rows},
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def get_values(rows):
+        return [
+            tuple(
+                getattr(row, field.attname)
+                for field in row._meta.concrete_fields
+            )
+            for row in rows
+        ]
+
+
+categories = ReferenceCache(Category, CATEGORIES)
+genres = ReferenceCache(Genre, GENRES)
+
+
+class ReferenceCacheMixin:
+    """
+    Список справочника отдаётся из ReferenceCache с заголовками ETag
+    и Last-Modified. Если версия у клиента актуальна, отвечаем 304,
+    не обращаясь к базе. Если кэш каталога не хранит версий, список
+    читается из базы без этих заголовков.
+    """
+
+    reference_cache = None
+
+    def list(self, request, *args, **kwargs):
+        snapshot = self.reference_cache.get_snapshot()
+        if snapshot.modified is None:
+            return self.get_list_response(request, snapshot.rows)
+        etag = '"{}-{}-{}"'.format(
+            self.reference_cache.entity, snapshot.modified,
+            request.accepted_renderer.format,
+        )
+        # Время изменения хранится в наносекундах.
+        last_modified = snapshot.modified // 10 ** 9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_list_response(request, snapshot.rows)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_list_response(self, request, rows):
+        rows = self.search_rows(request, rows)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.get_serializer(page, many=True).data
+            )
+        return Response(self.get_serializer(rows, many=True).data)
+
+    def search_rows(self, request, rows):
+        """Тот же поиск, что у SearchFilter, но по строкам в памяти."""
+        terms = [
+            term.casefold()
+            for term in SearchFilter().get_search_terms(request)
+        ]
+        if not terms:
+            return rows
+        return [
+            row for row in rows
+            if all(
+                any(
+                    term in str(getattr(row, field)).casefold()
+                    for field in self.search_fields
+                )
+                for term in terms
+            )
+        ]
@@ -0,0 +1,23 @@
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from api.search import check_fts
+
+
+@checks.register(checks.Tags.database)
+def check_search_index(app_configs, databases=None, **kwargs):
+    """Проверка триггеров полнотекстового индекса (manage.py check/migrate)."""
+    errors = []
+    for alias in databases or ():
+        try:
+            check_fts(alias)
+        except ImproperlyConfigured as error:
+            errors.append(checks.Error(
+                str(error),
+                hint=(
+                    'Чтобы применить миграцию, которая вернёт триггеры, '
+                    'запустите migrate с --skip-checks.'
+                ),
+                id='api.E001',
+            ))
+    return errors
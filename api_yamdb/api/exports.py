@@ -0,0 +1,64 @@
+import csv
+import json
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.mixins import get_eager_loading
+from api.renderers import dumps
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iterate_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(queryset, serializer_class, parent_fields, chunk_size):
+    """
+    Отдаём строки выгрузки по одной, читая таблицу курсором iterator()
+    порциями chunk_size. Связи «ко многим» подгружаются для каждой порции,
+    поэтому память не зависит от размера таблицы.
+    """
+    select, prefetch, columns = get_eager_loading(
+        queryset.model, serializer_class().fields
+    )
+    if select:
+        queryset = queryset.select_related(*select)
+    if columns is not None:
+        queryset = queryset.only(*columns, *parent_fields.values())
+    for chunk in iterate_chunks(queryset.iterator(chunk_size), chunk_size):
+        if prefetch:
+            prefetch_related_objects(chunk, *prefetch)
+        for obj, row in zip(chunk, serializer_class(chunk, many=True).data):
+            for name, attname in parent_fields.items():
+                row[name] = getattr(obj, attname)
+            yield row
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield dumps(row) + b'\n'
+
+
+def csv_lines(rows, header):
+    """Вложенные значения (категория, жанры) пишем в ячейку как JSON."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([
+            json.dumps(row[name], cls=JSONEncoder, ensure_ascii=False)
+            if isinstance(row[name], (dict, list)) else row[name]
+            for name in header
+        ])
@@ -0,0 +1,171 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.relations import SlugRelatedField
+from rest_framework.response import Response
+
+from api.mixins import get_model_field
+
+# Поля, значение которых из базы уже совпадает с выводом сериализатора.
+PLAIN_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+)
+
+
+class ValuesPlan:
+    """
+    План сборки вывода сериализатора из строк values(): для каждого
+    поля — функция, которая берёт значение из колонок строки.
+    Поля «ко многим» читаются одним дополнительным запросом на всю
+    страницу. Порядок ключей и значения совпадают с выводом
+    сериализатора.
+    """
+
+    def __init__(self, model, prefix=''):
+        self.pk_column = f'{prefix}{model._meta.pk.name}'
+        self.columns = [self.pk_column]
+        # (имя поля, функция от строки и подгруженных связей).
+        self.steps = []
+        # (имя поля, поле модели, план элемента).
+        self.many = []
+
+    def add_value(self, name, column, convert=None):
+        self.columns.append(column)
+        if convert is None:
+            self.steps.append((name, lambda row, related: row[column]))
+            return
+
+        def get_value(row, related):
+            value = row[column]
+            return None if value is None else convert(value)
+
+        self.steps.append((name, get_value))
+
+    def add_nested(self, name, plan):
+        self.columns.extend(plan.columns)
+        pk_column = plan.pk_column
+
+        def get_nested(row, related):
+            if row[pk_column] is None:
+                return None
+            return plan.serialize_row(row)
+
+        self.steps.append((name, get_nested))
+
+    def add_many(self, name, model_field, plan):
+        self.many.append((name, model_field, plan))
+        pk_column = self.pk_column
+        self.steps.append((
+            name, lambda row, related: related[name].get(row[pk_column], [])
+        ))
+
+    def serialize(self, rows):
+        related = {
+            name: self.fetch_many(model_field, plan, rows)
+            for name, model_field, plan in self.many
+        }
+        return [self.serialize_row(row, related) for row in rows]
+
+    def serialize_row(self, row, related=None):
+        return {
+            name: get_value(row, related) for name, get_value in self.steps
+        }
+
+    def fetch_many(self, model_field, plan, rows):
+        """
+        Элементы связи «многие ко многим» для всех строк одним запросом
+        по промежуточной таблице в порядке первичного ключа элемента.
+        """
+        items = defaultdict(list)
+        ids = [row[self.pk_column] for row in rows]
+        if not ids:
+            return items
+        through = model_field.remote_field.through
+        source = model_field.m2m_field_name()
+        target = model_field.m2m_reverse_field_name()
+        queryset = through.objects.filter(
+            **{f'{source}__in': ids}
+        ).order_by(f'{target}_id').values(f'{source}_id', *plan.columns)
+        for row in queryset:
+            items[row[f'{source}_id']].append(plan.serialize_row(row))
+        return items
+
+
+def compile_plan(serializer, model=None, prefix=''):
+    """
+    План для сериализатора или None, если какое-то поле нельзя
+    собрать из колонок (свойства модели, методы, обратные связи).
+    """
+    model = model or serializer.Meta.model
+    plan = ValuesPlan(model, prefix)
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if not compile_field(plan, name, field, model, prefix):
+            return None
+    return plan
+
+
+def compile_field(plan, name, field, model, prefix):
+    model_field = get_model_field(model, field)
+    if model_field is None:
+        return False
+    column = f'{prefix}{model_field.name}'
+    if not model_field.is_relation:
+        convert = (
+            None if isinstance(field, PLAIN_FIELDS)
+            else field.to_representation
+        )
+        plan.add_value(name, column, convert)
+        return True
+    if model_field.many_to_one and isinstance(field, SlugRelatedField):
+        plan.add_value(name, f'{column}__{field.slug_field}')
+        return True
+    if model_field.many_to_one and isinstance(
+        field, serializers.Serializer
+    ):
+        nested = compile_plan(field, model_field.related_model, f'{column}__')
+        if nested is None or nested.many:
+            return False
+        plan.add_nested(name, nested)
+        return True
+    if (
+        model_field.many_to_many and not model_field.auto_created
+        and isinstance(field, serializers.ListSerializer)
+    ):
+        target = model_field.m2m_reverse_field_name()
+        child = compile_plan(
+            field.child, model_field.related_model, f'{target}__'
+        )
+        if child is None or child.many:
+            return False
+        plan.add_many(name, model_field, child)
+        return True
+    return False
+
+
+class ValuesListMixin:
+    """
+    Список собирается из строк values() по плану сериализатора,
+    без объектов моделей и пополевого to_representation. Если поле
+    сериализатора так собрать нельзя, работает обычный list().
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        plan = compile_plan(serializer)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        ordering = [
+            field.lstrip('-')
+            for field in getattr(self.paginator, 'ordering', ())
+        ]
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values(*plan.columns, *ordering)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(plan.serialize(list(queryset)))
+        return self.get_paginated_response(plan.serialize(page))
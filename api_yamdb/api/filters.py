@@ -1,6 +1,8 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
 
+from api.search import search_titles
+
 
 class CharFilterInFilter(filters.BaseInFilter, filters.CharFilter):
     pass
@@ -24,7 +26,11 @@ class TitleFilter(filters.FilterSet):
     name = CharFilterInFilter(
         field_name='name', lookup_expr='in'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['genre', 'category', 'year', 'name']
+        fields = ['genre', 'category', 'year', 'name', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,353 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from reviews.models import Title
+
+from api.cache import categories, genres
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    # Python < 3.10.
+    def popcount(value):
+        return bin(value).count('1')
+
+
+def normalize_name(name):
+    """Ключ индекса: регистр и повторные пробелы не важны."""
+    return ' '.join(name.casefold().split())
+
+
+def bitset(ids):
+    """Битовое множество из id: бит с номером id выставлен."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for pk in ids:
+        bits[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class TitleNames:
+    """Отсортированный список (ключ названия, id) и названия по id."""
+
+    def __init__(self, rows):
+        self.names = {pk: (normalize_name(name), name) for pk, name in rows}
+        self.entries = sorted(
+            (key, pk) for pk, (key, _) in self.names.items()
+        )
+
+    def update(self, pk, name):
+        self.remove(pk)
+        key = normalize_name(name)
+        self.names[pk] = (key, name)
+        insort(self.entries, (key, pk))
+
+    def remove(self, pk):
+        if pk not in self.names:
+            return
+        key, _ = self.names.pop(pk)
+        del self.entries[bisect_left(self.entries, (key, pk))]
+
+    def search(self, prefix, limit):
+        key = normalize_name(prefix)
+        start = bisect_left(self.entries, (key,))
+        return [
+            {'id': pk, 'name': self.names[pk][1]}
+            for entry_key, pk in self.entries[start:start + limit]
+            if entry_key.startswith(key)
+        ]
+
+
+class TitleFacets:
+    """
+    Битовые индексы произведений: для каждой категории, года и жанра —
+    целое число, в котором выставлены биты с номерами id произведений.
+    """
+
+    FACETS = ('category', 'year', 'genre')
+
+    def __init__(self, rows):
+        # Сначала собираем списки id по значениям фасетов: установка
+        # бита в большое целое копирует его, и построение по одному
+        # биту стало бы квадратичным.
+        self.titles = {}
+        ids = {facet: defaultdict(list) for facet in self.FACETS}
+        for pk, category_id, year, genre_id in rows:
+            if pk not in self.titles:
+                self.titles[pk] = (category_id, year, set())
+                for facet, value in (('category', category_id),
+                                     ('year', year)):
+                    if value is not None:
+                        ids[facet][value].append(pk)
+            title_genres = self.titles[pk][2]
+            if genre_id is not None and genre_id not in title_genres:
+                title_genres.add(genre_id)
+                ids['genre'][genre_id].append(pk)
+        self.all = bitset(self.titles)
+        self.bitmaps = {
+            facet: defaultdict(int, {
+                value: bitset(pks) for value, pks in values.items()
+            })
+            for facet, values in ids.items()
+        }
+
+    def save_title(self, pk, category_id, year):
+        old_category_id, old_year, title_genres = self.titles.get(
+            pk, (None, None, set())
+        )
+        bit = 1 << pk
+        self._unset('category', old_category_id, bit)
+        self._unset('year', old_year, bit)
+        self.titles[pk] = (category_id, year, title_genres)
+        self.all |= bit
+        self._set('category', category_id, bit)
+        self._set('year', year, bit)
+
+    def remove_title(self, pk):
+        if pk not in self.titles:
+            return
+        self.clear_genres(pk)
+        category, year, _ = self.titles.pop(pk)
+        bit = 1 << pk
+        self.all &= ~bit
+        self._unset('category', category, bit)
+        self._unset('year', year, bit)
+
+    def add_genres(self, pk, genre_ids):
+        if pk not in self.titles:
+            return
+        title_genres = self.titles[pk][2]
+        for genre_id in genre_ids:
+            title_genres.add(genre_id)
+            self._set('genre', genre_id, 1 << pk)
+
+    def remove_genres(self, pk, genre_ids):
+        if pk not in self.titles:
+            return
+        title_genres = self.titles[pk][2]
+        for genre_id in genre_ids:
+            title_genres.discard(genre_id)
+            self._unset('genre', genre_id, 1 << pk)
+
+    def clear_genres(self, pk):
+        if pk in self.titles:
+            self.remove_genres(pk, list(self.titles[pk][2]))
+
+    def count(self, selection, ids=None):
+        """
+        Количество произведений по каждому значению каждого фасета.
+        selection — выбранные значения фасетов ({фасет: [значения]}),
+        ids — битовое множество, которым дополнительно ограничена выборка.
+        Для фасета учитываются все условия, кроме его собственного:
+        число рядом со значением — сколько произведений будет найдено,
+        если выбрать его вместо текущего.
+        """
+        base = self.all if ids is None else self.all & ids
+        masks = {
+            facet: self._union(facet, values)
+            for facet, values in selection.items()
+        }
+        result = {'count': popcount(self._intersect(base, masks.values()))}
+        for facet in self.FACETS:
+            mask = self._intersect(base, (
+                other_mask for other, other_mask in masks.items()
+                if other != facet
+            ))
+            counts = {}
+            for value, bitmap in self.bitmaps[facet].items():
+                found = popcount(bitmap & mask)
+                if found:
+                    counts[value] = found
+            result[facet] = counts
+        return result
+
+    def _union(self, facet, values):
+        mask = 0
+        for value in values:
+            mask |= self.bitmaps[facet].get(value, 0)
+        return mask
+
+    @staticmethod
+    def _intersect(mask, others):
+        for other in others:
+            mask &= other
+        return mask
+
+    def _set(self, facet, value, bit):
+        if value is not None:
+            self.bitmaps[facet][value] |= bit
+
+    def _unset(self, facet, value, bit):
+        if value is None or value not in self.bitmaps[facet]:
+            return
+        bitmap = self.bitmaps[facet][value] & ~bit
+        if bitmap:
+            self.bitmaps[facet][value] = bitmap
+        else:
+            del self.bitmaps[facet][value]
+
+
+class TitleIndex:
+    """
+    Индекс произведений в памяти процесса. Строится при первом
+    обращении, изменения этого процесса применяются сигналами сразу,
+    изменения других процессов подтягиваются фоновой перестройкой
+    раз в TITLE_INDEX_REFRESH секунд, пока запросы обслуживает
+    старая копия.
+    """
+
+    state_class = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._state = None
+            self._built_at = None
+            # Изменения, пришедшие во время фоновой перестройки.
+            self._pending = None
+
+    def build(self, rows):
+        state = self.state_class(rows)
+        with self._lock:
+            self._state = state
+            self._built_at = time.monotonic()
+
+    def load_rows(self):
+        raise NotImplementedError
+
+    def change(self, method, *args):
+        """Применяем изменение к построенному индексу."""
+        with self._lock:
+            if self._state is None:
+                return
+            getattr(self._state, method)(*args)
+            if self._pending is not None:
+                self._pending.append((method, args))
+
+    def query(self, method, *args):
+        self._ensure_built()
+        with self._lock:
+            return getattr(self._state, method)(*args)
+
+    def _ensure_built(self):
+        if self._state is None:
+            self.build(self.load_rows())
+            return
+        refresh = settings.TITLE_INDEX_REFRESH
+        with self._lock:
+            if (
+                refresh is None
+                or self._pending is not None
+                or time.monotonic() - self._built_at < refresh
+            ):
+                return
+            self._pending = []
+        threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            state = self.state_class(self.load_rows())
+        except DatabaseError:
+            # Оставляем старый индекс и пробуем снова в следующий раз.
+            with self._lock:
+                self._pending = None
+                self._built_at = time.monotonic()
+            return
+        finally:
+            connection.close()
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                # Индекс сбросили, пока шла перестройка.
+                return
+            for method, args in pending:
+                getattr(state, method)(*args)
+            self._state = state
+            self._built_at = time.monotonic()
+
+
+class TitleNameIndex(TitleIndex):
+    """Поиск произведений по началу названия бинарным поиском."""
+
+    state_class = TitleNames
+
+    def load_rows(self):
+        return Title.objects.order_by().values_list('id', 'name').iterator(
+            chunk_size=10000
+        )
+
+    def search(self, prefix, limit):
+        """Первые limit произведений, название которых начинается с prefix."""
+        return self.query('search', prefix, limit)
+
+    def update(self, pk, name):
+        self.change('update', pk, name)
+
+    def remove(self, pk):
+        self.change('remove', pk)
+
+
+class TitleFacetIndex(TitleIndex):
+    """Количество произведений по категориям, годам и жанрам."""
+
+    state_class = TitleFacets
+
+    def load_rows(self):
+        return Title.objects.order_by().values_list(
+            'id', 'category_id', 'year', 'genre'
+        ).iterator(chunk_size=10000)
+
+    def count(self, selection, ids=None):
+        return self.query('count', selection, ids)
+
+
+title_names = TitleNameIndex()
+title_facets = TitleFacetIndex()
+
+
+def count_title_facets(filterset):
+    """
+    Фасеты для выборки TitleFilter. Жанры, категории и год считаются
+    по битовому индексу; условия по названию и поиску, которых
+    в индексе нет, превращаются в битовое множество id из базы.
+    """
+    data = filterset.form.cleaned_data
+    selection = {}
+    for facet, reference in (('category', categories), ('genre', genres)):
+        if data.get(facet):
+            selection[facet] = [
+                obj.pk for obj in map(reference.get_by_slug, data[facet])
+                if obj is not None
+            ]
+    if data.get('year') is not None:
+        selection['year'] = [int(data['year'])]
+
+    ids = None
+    queryset = Title.objects.order_by()
+    for name in ('name', 'search'):
+        if data.get(name):
+            queryset = filterset.filters[name].filter(queryset, data[name])
+            ids = bitset(queryset.values_list('id', flat=True))
+
+    counts = title_facets.count(selection, ids)
+    for facet, reference in (('category', categories), ('genre', genres)):
+        slugs = {obj.pk: obj.slug for obj in reference.get_rows()}
+        counts[facet] = {
+            slugs[pk]: found for pk, found in counts[facet].items()
+            if pk in slugs
+        }
+    return {
+        'count': counts['count'],
+        'genre': dict(sorted(counts['genre'].items())),
+        'category': dict(sorted(counts['category'].items())),
+        'year': dict(sorted(counts['year'].items())),
+    }
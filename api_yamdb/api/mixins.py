@@ -1,5 +1,13 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import (ManyRelatedField,
+                                      PrimaryKeyRelatedField,
+                                      SlugRelatedField)
 from rest_framework.viewsets import GenericViewSet
 
 
@@ -8,3 +16,168 @@ class CRUDMixinSet(
     DestroyModelMixin, GenericViewSet
 ):
     pass
+
+
+def get_model_field(model, field):
+    """Поле модели, из которого читает поле сериализатора, или None."""
+    if len(field.source_attrs) != 1:
+        return None
+    try:
+        return model._meta.get_field(field.source_attrs[0])
+    except FieldDoesNotExist:
+        return None
+
+
+def get_eager_loading(model, fields):
+    """
+    Разбираем поля сериализатора и возвращаем связи для select_related,
+    объекты Prefetch и колонки для only().
+    Если колонки вычислить нельзя (например, поле читает свойство модели),
+    вместо списка колонок возвращается None.
+    """
+    select, prefetch = [], []
+    # Первичный и внешние ключи нужны всегда: по ним Django связывает
+    # объекты, а права доступа сравнивают авторов.
+    columns = {
+        model_field.attname for model_field in model._meta.concrete_fields
+        if model_field.primary_key or model_field.many_to_one
+    }
+    projectable = True
+    for field in fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        model_field = get_model_field(model, field)
+        if model_field is None:
+            projectable = False
+        elif not model_field.is_relation:
+            columns.add(model_field.attname)
+        elif (
+            isinstance(field, (serializers.ListSerializer, ManyRelatedField))
+            or model_field.one_to_many or model_field.many_to_many
+        ):
+            prefetch.append(Prefetch(
+                model_field.name,
+                queryset=get_related_queryset(model_field, field),
+            ))
+        else:
+            related_select, related_prefetch, related_columns = (
+                get_forward_loading(model_field, field)
+            )
+            select.extend(related_select)
+            prefetch.extend(related_prefetch)
+            columns.update(related_columns)
+    return select, prefetch, columns if projectable else None
+
+
+def get_forward_loading(model_field, field):
+    """Подгрузка связи «к одному» для поля сериализатора."""
+    name = model_field.name
+    if isinstance(field, PrimaryKeyRelatedField):
+        return [], [], {model_field.attname}
+    if isinstance(field, SlugRelatedField):
+        return [name], [], {name, f'{name}__{field.slug_field}'}
+    if not isinstance(field, serializers.BaseSerializer):
+        return [name], [], {name}
+    select, prefetch, columns = get_eager_loading(
+        model_field.related_model, field.fields
+    )
+    return (
+        [name] + [f'{name}__{path}' for path in select],
+        [
+            Prefetch(f'{name}__{item.prefetch_through}', item.queryset)
+            for item in prefetch
+        ],
+        {name} | {f'{name}__{column}' for column in columns or ()},
+    )
+
+
+def get_related_queryset(model_field, field):
+    """
+    Queryset для подгрузки связи «ко многим» с учётом вложенных полей.
+    Без сортировки модели элементы идут в порядке первичного ключа,
+    как и в ответах, собранных из values().
+    """
+    queryset = model_field.related_model._default_manager.all()
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+    if isinstance(field, ManyRelatedField):
+        child = field.child_relation
+        if isinstance(child, SlugRelatedField):
+            return queryset.only(child.slug_field)
+        return queryset
+    if not isinstance(field, serializers.ListSerializer):
+        return queryset
+    select, prefetch, columns = get_eager_loading(
+        model_field.related_model, field.child.fields
+    )
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if columns is not None:
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Подгружаем связанные объекты, которые нужны активному сериализатору,
+    чтобы список выполнялся за постоянное число запросов.
+    """
+
+    def filter_queryset(self, queryset):
+        return super().filter_queryset(self.eager_load(queryset))
+
+    def eager_load(self, queryset):
+        if self.request.method == 'DELETE':
+            return queryset
+        select, prefetch, columns = get_eager_loading(
+            queryset.model, self.get_serializer().fields
+        )
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columns is not None and self.request.method in SAFE_METHODS:
+            # Поля сортировки курсора нужны для ссылок на соседние страницы.
+            ordering = getattr(self.paginator, 'ordering', ())
+            queryset = queryset.only(
+                *columns, *(field.lstrip('-') for field in ordering)
+            )
+        return queryset
+
+
+class CursorPaginationMixin:
+    """
+    Включаем постраничный вывод по курсору, если клиент передал
+    параметр cursor (пустое значение — первая страница).
+    Без параметра работает обычная пагинация по номерам страниц.
+    Курсор задаёт свою сортировку, поэтому его нельзя сочетать
+    с параметрами из cursor_excluded_params, которые сортируют
+    выдачу иначе.
+    """
+
+    cursor_pagination_class = None
+    cursor_excluded_params = ()
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.pagination_class
+            params = self.request.query_params
+            if (
+                self.cursor_pagination_class is not None
+                and self.cursor_pagination_class.cursor_query_param
+                in params
+            ):
+                for name in self.cursor_excluded_params:
+                    if params.get(name):
+                        raise ValidationError({
+                            self.cursor_pagination_class.cursor_query_param:
+                            f'Курсор нельзя сочетать с параметром {name}.'
+                        })
+                pagination_class = self.cursor_pagination_class
+            self._paginator = (
+                pagination_class() if pagination_class is not None else None
+            )
+        return self._paginator
@@ -0,0 +1,165 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по курсору (keyset).
+    Следующая страница выбирается условием по ключу сортировки
+    последней записи, поэтому глубокие страницы стоят столько же,
+    сколько первая: без COUNT(*) и OFFSET.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        order_by = [
+            f'-{field}' if descending != reverse else field
+            for field, descending in zip(self.fields, self.descending)
+        ]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(
+                position, reverse
+            ))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = (
+            self.get_position(rows[-1]) if has_next and rows else None
+        )
+        self.previous_position = (
+            self.get_position(rows[0]) if has_previous and rows else None
+        )
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_position(self, row):
+        # Строки бывают объектами моделей и словарями values().
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Условие «строго после позиции» в порядке сортировки:
+        (a > x) OR (a = x AND b > y) ... Первое поле дополнительно
+        ограничено нестрогим неравенством, чтобы база могла пройти
+        по составному индексу диапазоном.
+        """
+        lookups = [
+            'lt' if descending != reverse else 'gt'
+            for descending in self.descending
+        ]
+        keyset = Q()
+        for index, (field, value) in enumerate(zip(self.fields, position)):
+            condition = Q(**{f'{field}__{lookups[index]}': value})
+            for equal_field, equal_value in zip(
+                self.fields[:index], position[:index]
+            ):
+                condition &= Q(**{equal_field: equal_value})
+            keyset |= condition
+        first_field = f'{self.fields[0]}__{lookups[0]}e'
+        return Q(**{first_field: position[0]}) & keyset
+
+    def encode_cursor(self, position, reverse):
+        # isoformat() сохраняет микросекунды, иначе позиция на границе
+        # страниц потеряла бы точность.
+        payload = json.dumps(
+            {
+                'p': [
+                    value.isoformat() if hasattr(value, 'isoformat')
+                    else value
+                    for value in position
+                ],
+                'r': int(reverse),
+            },
+            separators=(',', ':'),
+        )
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor.rstrip('=')
+        )
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ))
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, payload['p'])
+            ]
+            reverse = bool(payload['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.fields) or None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class TitleCursorPagination(KeysetPagination):
+    """Курсор по произведениям в порядке id."""
+
+    ordering = ('id',)
+
+
+class PubDateCursorPagination(KeysetPagination):
+    """Курсор по отзывам и комментариям в порядке (pub_date, id)."""
+
+    ordering = ('pub_date', 'id')
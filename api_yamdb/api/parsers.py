@@ -0,0 +1,56 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from api.renderers import (CBORRenderer, FastJSONRenderer,
+                           MessagePackRenderer, cbor2, msgpack, orjson)
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser, который разбирает тело запроса через orjson.
+    Тела не в UTF-8, нестрогий режим и установка без orjson
+    обрабатываются стандартным JSONParser.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace('-', '') != 'utf8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson, как и STRICT_JSON, не принимает NaN и Infinity.
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """Тело запроса в MessagePack (Content-Type: application/msgpack)."""
+
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            # Сюда входят ExtraData, FormatError и StackError.
+            raise ParseError(f'MessagePack parse error - {exc}')
+
+
+class CBORParser(BaseParser):
+    """Тело запроса в CBOR (Content-Type: application/cbor)."""
+
+    media_type = 'application/cbor'
+    renderer_class = CBORRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return cbor2.loads(stream.read())
+        except cbor2.CBORDecodeError as exc:
+            raise ParseError(f'CBOR parse error - {exc}')
@@ -0,0 +1,126 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+# Как и JSONRenderer, экранируем разделители строк: ответ должен
+# оставаться корректным JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+# Типы, которых нет в JSON (даты, Decimal, UUID, ленивые строки),
+# кодируем так же, как JSONRenderer DRF.
+json_default = JSONEncoder().default
+
+
+def dumps(data):
+    """
+    Компактный JSON в UTF-8, совпадающий с выводом JSONRenderer
+    (UNICODE_JSON и COMPACT_JSON включены). С orjson — быстрее,
+    без него — через json стандартной библиотеки.
+    """
+    if orjson is None:
+        content = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False,
+            allow_nan=False, separators=(',', ':'),
+        )
+        return content.replace('\u2028', '\\u2028').replace(
+            '\u2029', '\\u2029'
+        ).encode()
+    content = orjson.dumps(
+        data, default=json_default,
+        # Даты кодируем сами: у orjson свой формат смещения и микросекунд.
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+    for separator, escaped in LINE_SEPARATORS:
+        if separator in content:
+            content = content.replace(separator, escaped)
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer, который кодирует ответ через orjson.
+    Отступы (Accept: application/json; indent=4, Browsable API),
+    ASCII-вывод, некомпактный и нестрогий режимы отдаются
+    стандартному JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return dumps(data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Ответ в MessagePack (Accept: application/msgpack). Даты, Decimal
+    и UUID кодируются строками и числами, как в JSON-ответе.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=json_default, use_bin_type=True)
+
+
+def cbor_default(encoder, value):
+    encoder.encode(json_default(value))
+
+
+# Эти типы cbor2 кодирует тегами CBOR; отдаём их так же, как в JSON.
+CBOR_ENCODERS = dict.fromkeys(
+    (datetime, date, time, Decimal, uuid.UUID), cbor_default
+)
+
+
+class CBORRenderer(BaseRenderer):
+    """Ответ в CBOR (Accept: application/cbor), значения — как в JSON."""
+
+    media_type = 'application/cbor'
+    format = 'cbor'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return cbor2.dumps(
+            data, default=cbor_default, encoders=CBOR_ENCODERS
+        )
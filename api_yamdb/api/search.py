@@ -0,0 +1,76 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+# Триггеры из миграции 0032. Пересборка таблицы reviews_title
+# (AlterField на SQLite) молча удаляет их, и индекс перестаёт
+# обновляться, поэтому их наличие проверяется отдельно.
+FTS_TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+TOKEN_PATTERN = re.compile(r'\w+')
+
+_fts_available = {}
+
+
+def get_missing_triggers(connection):
+    """Триггеры полнотекстового индекса, которых нет в базе."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'reviews_title'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+    return [name for name in FTS_TRIGGERS if name not in existing]
+
+
+def check_fts(using):
+    """
+    Есть ли в базе полнотекстовый индекс произведений (SQLite FTS5).
+    Если индекс есть, а его триггеров нет, поднимаем ImproperlyConfigured:
+    поиск по такому индексу возвращал бы устаревшие результаты.
+    """
+    connection = connections[using]
+    if (
+        connection.vendor != 'sqlite'
+        or FTS_TABLE not in connection.introspection.table_names()
+    ):
+        return False
+    missing = get_missing_triggers(connection)
+    if missing:
+        raise ImproperlyConfigured(
+            f'Нет триггеров полнотекстового индекса {FTS_TABLE}: '
+            f'{", ".join(missing)}. Пересоздайте их SQL из миграции '
+            f'reviews 0032_title_search_fts и перестройте индекс.'
+        )
+    return True
+
+
+def has_fts(using):
+    if using not in _fts_available:
+        _fts_available[using] = check_fts(using)
+    return _fts_available[using]
+
+
+def search_titles(queryset, query):
+    """
+    Ищем произведения по названию и описанию. Все слова запроса
+    должны встретиться (последнее — как префикс), результаты
+    упорядочены по BM25. Без FTS5 — поиск через icontains.
+    """
+    tokens = TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return queryset
+    if not has_fts(queryset.db):
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(name__icontains=token) | Q(description__icontains=token)
+            )
+        return queryset
+    match = ' '.join(f'"{token}"' for token in tokens) + '*'
+    # Соединяем с индексом: MATCH и ранг BM25 считаются за один
+    # проход по индексу, а не отдельным подзапросом на строку.
+    return queryset.filter(search_index__document__match=match).order_by(
+        'search_index__rank', 'id'
+    )
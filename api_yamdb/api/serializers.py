@@ -1,10 +1,56 @@
+from auth.confirmation_code import check_confirmation_code
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from users.models import UserRole
 
+from api.cache import categories, genres, is_catalog_cache_shared
+
+
+def get_field_names(params, name):
+    """Имена полей из параметра запроса вида ?fields=id,name."""
+    return {
+        value.strip() for value in params.get(name, '').split(',')
+        if value.strip()
+    }
+
+
+class SparseFieldsMixin:
+    """
+    Набор полей ответа задаётся параметрами запроса: ?fields=id,name
+    оставляет только перечисленные поля, ?omit=description убирает
+    указанные. Поля из optional_fields выводятся, только если их
+    запросили через ?include= или ?fields=. Параметры действуют
+    только на чтение; по оставшимся полям EagerLoadingMixin выбирает
+    колонки и связи для запроса к базе.
+    """
+
+    optional_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        params = (
+            request.query_params
+            if request is not None and request.method in SAFE_METHODS
+            else {}
+        )
+        requested = get_field_names(params, 'fields')
+        if requested:
+            keep = requested
+        else:
+            keep = set(self.fields) - (
+                set(self.optional_fields) - get_field_names(params, 'include')
+            )
+        keep -= get_field_names(params, 'omit')
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
 
 class SignUpSerializer(serializers.ModelSerializer):
     """
@@ -23,14 +69,6 @@ class SignUpSerializer(serializers.ModelSerializer):
             raise ValidationError({"message": "недопустимый username"})
         return username
 
-    def validate(self, data):
-        if User.objects.filter(username=data['username']).exists():
-            user = User.objects.get(username=data['username'])
-            if user.email == data['email']:
-                return data
-            raise ValidationError({"message": "Неверный email"})
-        return data
-
 
 class ActivationSerializer(serializers.Serializer):
     """
@@ -46,14 +84,15 @@ class ActivationSerializer(serializers.Serializer):
 
     def validate(self, data):
         user = get_object_or_404(User, username=data['username'])
-        if data['confirmation_code'] != user.confirmation_code:
+        if not check_confirmation_code(user, data['confirmation_code']):
             raise ValidationError(
                 {"Ошибка": 'Неверный код подтверждения'}
             )
+        data['user'] = user
         return data
 
 
-class AdminSerializer(serializers.ModelSerializer):
+class AdminSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор работы администратора с доступом к ролям.
     """
@@ -85,7 +124,7 @@ class UsersSerializer(serializers.ModelSerializer):
         read_only_fields = ('username', 'email', 'role',)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор категории.
     """
@@ -95,7 +134,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор жанра.
     """
@@ -105,6 +144,30 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Слаг ищется в справочнике в памяти процесса, без запроса к базе.
+    Справочник используется, только если кэш каталога общий: иначе
+    запись, удалённая другим процессом, нашлась бы в копии и привела
+    к ошибке внешнего ключа. Если слага в копии нет, ищем его в базе.
+    """
+
+    def __init__(self, reference_cache, **kwargs):
+        self.reference_cache = reference_cache
+        kwargs.setdefault('queryset', reference_cache.model.objects.all())
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = None
+        if is_catalog_cache_shared():
+            obj = self.reference_cache.get_by_slug(data)
+        if obj is None:
+            return super().to_internal_value(data)
+        return obj
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор создания произведений.
@@ -113,15 +176,8 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     name = serializers.CharField(
         max_length=200,
     )
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(),
-        slug_field='slug',
-    )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-        many=True,
-    )
+    category = CachedSlugRelatedField(categories)
+    genre = CachedSlugRelatedField(genres, many=True)
 
     class Meta:
         model = Title
@@ -131,27 +187,63 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleReciveSerializer(serializers.ModelSerializer):
+class ScoreDistributionField(serializers.Field):
+    """
+    Гистограмма оценок произведения: сколько отзывов с каждой оценкой.
+    Читается из счётчиков TitleScore, нулевые оценки дополняются.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', 'scores')
+        super().__init__(**kwargs)
+
+    def to_representation(self, scores):
+        counts = {item.score: item.count for item in scores.all()}
+        return {
+            str(score): counts.get(score, 0)
+            for score in range(
+                settings.MIN_SCORE_VALUE, settings.MAX_SCORE_VALUE + 1
+            )
+        }
+
+
+class TitleReciveSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор получения произведений.
     """
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.FloatField()
+    rating = serializers.FloatField(read_only=True)
+    score_distribution = ScoreDistributionField()
+
+    optional_fields = ('score_distribution',)
 
     class Meta:
         model = Title
         fields = (
             'name', 'year', 'category',
-            'description', 'genre', 'id', 'rating'
+            'description', 'genre', 'id', 'rating', 'score_distribution',
         )
         read_only_fields = (
             'id', 'name', 'year', 'rating', 'description',
         )
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class TitleStatsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Сериализатор статистики оценок произведения.
+    """
+
+    score_distribution = ScoreDistributionField()
+
+    class Meta:
+        model = Title
+        fields = ('id', 'rating', 'rating_count', 'score_distribution')
+
+
+class ReviewsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор модели Отзывов.
     """
@@ -166,6 +258,7 @@ class ReviewsSerializer(serializers.ModelSerializer):
         model = Review
         fields = (
             'id', 'text', 'author', 'score', 'pub_date',
+            'comment_count', 'last_comment_at',
         )
 
     def validate_score(self, value):
@@ -178,18 +271,22 @@ class ReviewsSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, data):
-        """Проверяем, что отзыв на произведение не был написан."""
-        if self.context['request'].method != 'POST':
-            return data
-        author = self.context['request'].user
-        title_id = self.context['view'].kwargs.get('title_id')
-        if Review.objects.filter(author=author, title__id=title_id).exists():
-            raise serializers.ValidationError('Нельзя дважды писать отзыв!')
-        return data
-
-
-class CommentSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        """
+        Повторный отзыв на произведение отсекает ограничение
+        unique_author_title при вставке, без отдельного запроса.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Нельзя дважды писать отзыв!'
+                ],
+            })
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор модели Комментариев.
     """
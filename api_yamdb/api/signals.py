@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Title
+from reviews.signals import data_loaded, rating_changed
+
+from api.cache import (CATEGORIES, GENRES, TITLE_DETAILS, TITLES,
+                       bump_versions_on_commit, title_entity)
+from api.indexes import title_facets, title_names
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_versions_on_commit(TITLES, title_entity(instance.pk))
+
+
+@receiver(post_save, sender=Title)
+def title_indexes_saved(sender, instance, **kwargs):
+    pk, name = instance.pk, instance.name
+    category_id, year = instance.category_id, instance.year
+
+    def update_indexes():
+        title_names.update(pk, name)
+        title_facets.change('save_title', pk, category_id, year)
+
+    transaction.on_commit(update_indexes)
+
+
+@receiver(post_delete, sender=Title)
+def title_indexes_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+
+    def update_indexes():
+        title_names.remove(pk)
+        title_facets.change('remove_title', pk)
+
+    transaction.on_commit(update_indexes)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_indexed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse and action == 'post_clear':
+        # Какие произведения были у жанра, уже неизвестно.
+        transaction.on_commit(title_facets.reset)
+        return
+    method = {
+        'post_add': 'add_genres',
+        'post_remove': 'remove_genres',
+        'post_clear': 'clear_genres',
+    }[action]
+    if reverse:
+        changes = [(pk, [instance.pk]) for pk in pk_set]
+    elif action == 'post_clear':
+        changes = [(instance.pk,)]
+    else:
+        changes = [(instance.pk, list(pk_set))]
+
+    def update_index():
+        for args in changes:
+            title_facets.change(method, *args)
+
+    transaction.on_commit(update_index)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Изменились произведения жанра: затрагивает детали многих записей.
+        bump_versions_on_commit(TITLES, TITLE_DETAILS)
+    else:
+        bump_versions_on_commit(TITLES, title_entity(instance.pk))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_versions_on_commit(CATEGORIES)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def facet_deleted(sender, **kwargs):
+    # Связи произведений удалены или обнулены в обход их сигналов.
+    transaction.on_commit(title_facets.reset)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    bump_versions_on_commit(GENRES)
+
+
+@receiver(rating_changed, sender=Title)
+def title_rating_changed(sender, title_id, **kwargs):
+    if title_id is None:
+        bump_versions_on_commit(TITLES, TITLE_DETAILS)
+    else:
+        bump_versions_on_commit(TITLES, title_entity(title_id))
+
+
+@receiver(data_loaded)
+def catalog_loaded(sender, **kwargs):
+    bump_versions_on_commit(TITLES, TITLE_DETAILS, CATEGORIES, GENRES)
+    title_names.reset()
+    title_facets.reset()
@@ -0,0 +1,137 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBuckets:
+    """
+    Корзины токенов в памяти процесса. Корзина вмещает capacity
+    токенов и пополняется со скоростью rate токенов в секунду;
+    каждый запрос забирает один токен. Когда корзин становится больше
+    AUTH_THROTTLE_MAX_BUCKETS, снова наполнившиеся удаляются: их
+    состояние совпадает с отсутствующими.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, rate, now):
+        """Забираем токен; возвращаем 0 или сколько секунд ждать токена."""
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            # Третье значение — когда корзина снова станет полной.
+            self._buckets[key] = (
+                tokens, now, now + (capacity - tokens) / rate
+            )
+            if len(self._buckets) > settings.AUTH_THROTTLE_MAX_BUCKETS:
+                self.prune(now)
+            return wait
+
+    def prune(self, now):
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if bucket[2] > now
+        }
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheTokenBuckets:
+    """
+    Корзины токенов в общем кэше, чтобы лимит действовал на все
+    процессы. Чтение и запись корзины не атомарны: при гонке
+    параллельные запросы могут забрать на несколько токенов больше.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, rate, now):
+        key = f'token-bucket:{key}'
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = 0 if tokens >= 1 else (1 - tokens) / rate
+        if not wait:
+            tokens -= 1
+        self.cache.set(key, (tokens, now), (capacity - tokens) / rate + 1)
+        return wait
+
+
+buckets = TokenBuckets()
+
+
+def get_buckets():
+    alias = settings.AUTH_THROTTLE_CACHE_ALIAS
+    return buckets if alias is None else CacheTokenBuckets(alias)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты по корзинам токенов: скорость из
+    DEFAULT_THROTTLE_RATES[scope] вида '10/min' задаёт и размер
+    корзины (10 запросов подряд), и её пополнение (10 в минуту).
+    Проверка идёт в APIView.initial, до сериализатора и базы.
+    """
+
+    def get_rate(self):
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def get_cache_keys(self, request, view):
+        raise NotImplementedError('.get_cache_keys() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        store = get_buckets()
+        now = self.timer()
+        self.retry_after = max((
+            store.consume(
+                f'{self.scope}:{key}', self.num_requests,
+                self.num_requests / self.duration, now,
+            )
+            for key in self.get_cache_keys(request, view)
+        ), default=0)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Запросы к регистрации и выдаче токена с одного адреса."""
+
+    scope = 'auth_ip'
+
+    def get_cache_keys(self, request, view):
+        return [self.get_ident(request)]
+
+
+class AuthIdentityThrottle(TokenBucketThrottle):
+    """
+    Запросы с одним username или email: отдельная корзина на каждое
+    значение, запрос проходит, если токен есть во всех.
+    """
+
+    scope = 'auth_identity'
+    identity_fields = ('username', 'email')
+
+    def get_cache_keys(self, request, view):
+        data = request.data
+        if not isinstance(data, dict):
+            return []
+        return [
+            f'{field}:{str(data[field]).lower()}'
+            for field in self.identity_fields
+            if data.get(field)
+        ]
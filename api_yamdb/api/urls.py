@@ -2,9 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
 from api.views import (
-    Activation, CategoryViewSet,
+    Activation, CategoryViewSet, CommentExport,
     CommentsViewSet, GenreViewSet, UserViewSet,
-    ReviewsViewSet, SignUp, TitleViewSet
+    ReviewExport, ReviewsViewSet, SignUp, TitleExport, TitleViewSet
 )
 
 app_name = 'api'
@@ -46,4 +46,14 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignUp.as_view(), name='sign_up'),
     path('v1/auth/token/', Activation.as_view(), name='activation'),
+    path(
+        'v1/export/titles/', TitleExport.as_view(), name='export_titles'
+    ),
+    path(
+        'v1/export/reviews/', ReviewExport.as_view(), name='export_reviews'
+    ),
+    path(
+        'v1/export/comments/', CommentExport.as_view(),
+        name='export_comments'
+    ),
 ]
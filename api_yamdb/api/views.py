@@ -1,26 +1,39 @@
 from auth.get_token import get_tokens_for_user
-from auth.send_code import send_mail_with_code
+from auth.send_code import (in_resend_cooldown, send_mail_with_code,
+                            start_resend_cooldown)
 from django.conf import settings
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import Category, Comment, Genre, Review, Title, User
 
+from api.asyncviews import AsyncReadMixin
+from api.cache import (CATEGORIES, GENRES, TITLES, CatalogCacheMixin,
+                       ReferenceCacheMixin, categories, genres)
+from api.exports import csv_lines, export_rows, ndjson_lines
+from api.fastpath import ValuesListMixin
 from api.filters import TitleFilter
-from api.mixins import CRUDMixinSet
+from api.indexes import count_title_facets, title_names
+from api.mixins import (CRUDMixinSet, CursorPaginationMixin,
+                        EagerLoadingMixin)
+from api.pagination import PubDateCursorPagination, TitleCursorPagination
 from api.permissions import (AuthorOrStaffOrReadOnly, ChangeAdminOnly,
                              StaffOrReadOnly)
 from api.serializers import (ActivationSerializer, AdminSerializer,
                              CategorySerializer, CommentSerializer,
                              GenreSerializer, ReviewsSerializer,
                              SignUpSerializer, TitleCreateSerializer,
-                             TitleReciveSerializer, UsersSerializer)
+                             TitleReciveSerializer, TitleStatsSerializer,
+                             UsersSerializer)
+from api.throttling import AuthIdentityThrottle, AuthIPThrottle
 
 
 class SignUp(APIView):
@@ -29,22 +42,35 @@ class SignUp(APIView):
     """
 
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        # Код этому пользователю недавно отправлен: отвечаем как
+        # обычно, не обращаясь к базе и не отправляя письмо.
+        if in_resend_cooldown(**serializer.validated_data):
+            return Response(serializer.data, status=status.HTTP_200_OK)
         try:
-            user = User.objects.get_or_create(
-                username=serializer.validated_data['username'],
-                email=serializer.validated_data['email'],
-            )[settings.SIGN_UP_USER_INDEX]
+            # Сначала пробуем вставить нового пользователя: для новой
+            # регистрации это единственный запрос к таблице. Пользователь
+            # и письмо с кодом в очереди сохраняются вместе; письмо
+            # уходит после фиксации транзакции.
+            with transaction.atomic():
+                user = User.objects.create(**serializer.validated_data)
+                send_mail_with_code(user)
+            start_resend_cooldown(user)
         except IntegrityError:
-            return Response(
-                'Имя пользователя или электронная почта занята.',
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        user.confirmation_code = send_mail_with_code(request.data)
-        user.save()
+            # Повторный запрос кода: пара username и email должна
+            # совпадать с уже зарегистрированной.
+            user = User.objects.filter(**serializer.validated_data).first()
+            if user is None:
+                return Response(
+                    'Имя пользователя или электронная почта занята.',
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if start_resend_cooldown(user):
+                send_mail_with_code(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -54,20 +80,17 @@ class Activation(APIView):
     """
 
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
 
     def post(self, request):
         serializer = ActivationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            User,
-            username=serializer.validated_data['username']
-        )
-        token = get_tokens_for_user(user)
+        token = get_tokens_for_user(serializer.validated_data['user'])
         return Response({'token': token},
                         status=status.HTTP_201_CREATED)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """
     Работа с пользователями.
     """
@@ -96,12 +119,13 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(CRUDMixinSet):
+class CategoryViewSet(AsyncReadMixin, ReferenceCacheMixin, CRUDMixinSet):
     """
     Получить список всех категорий.
     """
 
     queryset = Category.objects.all()
+    reference_cache = categories
     serializer_class = CategorySerializer
     permission_classes = (StaffOrReadOnly,)
     filter_backends = (SearchFilter, )
@@ -109,12 +133,13 @@ class CategoryViewSet(CRUDMixinSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CRUDMixinSet):
+class GenreViewSet(AsyncReadMixin, ReferenceCacheMixin, CRUDMixinSet):
     """
     Получить список всех жанров.
     """
 
     queryset = Genre.objects.all()
+    reference_cache = genres
     serializer_class = GenreSerializer
     permission_classes = (StaffOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -122,7 +147,10 @@ class GenreViewSet(CRUDMixinSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    AsyncReadMixin, CatalogCacheMixin, CursorPaginationMixin, ValuesListMixin,
+    EagerLoadingMixin, viewsets.ModelViewSet
+):
     """
     Получить список всех произведений.
     """
@@ -132,9 +160,9 @@ class TitleViewSet(viewsets.ModelViewSet):
     filterset_class = TitleFilter
     permission_classes = (StaffOrReadOnly,)
     serializer_class = TitleReciveSerializer
-
-    def get_queryset(self):
-        return Title.objects.annotate(rating=Avg('reviews__score'))
+    cursor_pagination_class = TitleCursorPagination
+    # Результаты поиска упорядочены по релевантности, а не по id.
+    cursor_excluded_params = ('search',)
 
     def get_serializer_class(self):
         """
@@ -143,12 +171,110 @@ class TitleViewSet(viewsets.ModelViewSet):
         была использована и возвращаем серриализаторы
         для записи и чтения.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'bulk']:
             return TitleReciveSerializer
+        if self.action == 'stats':
+            return TitleStatsSerializer
         return TitleCreateSerializer
 
+    @action(
+        detail=False, methods=['get'],
+        url_path='autocomplete', url_name='autocomplete',
+    )
+    def autocomplete(self, request):
+        """
+        Подсказки по началу названия: id и название первых limit
+        произведений в алфавитном порядке. Ответ собирается
+        из индекса в памяти, без запросов к базе.
+        """
+        prefix = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get(
+                'limit', settings.TITLE_AUTOCOMPLETE_LIMIT
+            ))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError(
+                {'limit': 'Ожидается положительное целое число.'}
+            )
+        if not prefix:
+            return Response([])
+        limit = min(limit, settings.TITLE_AUTOCOMPLETE_MAX_LIMIT)
+        return Response(title_names.search(prefix, limit))
+
+    @action(
+        detail=False, methods=['get'],
+        url_path='bulk', url_name='bulk',
+    )
+    def bulk(self, request):
+        """
+        Несколько произведений по списку id (?ids=3,1,2) за постоянное
+        число запросов. Порядок ответа совпадает с порядком в запросе,
+        id несуществующих произведений возвращаются в missing.
+        """
+        return self.get_cached_response(
+            self.get_bulk_response, (TITLES, CATEGORIES, GENRES), request
+        )
+
+    def get_bulk_response(self, request):
+        # Словарь убирает повторы и сохраняет порядок запроса.
+        ids = {}
+        for value in request.query_params.get('ids', '').split(','):
+            try:
+                pk = int(value)
+            except ValueError:
+                pk = -1
+            if pk < 0:
+                raise ValidationError(
+                    {'ids': 'Ожидается список id через запятую.'}
+                )
+            ids[pk] = None
+            if len(ids) > settings.TITLES_BULK_MAX_IDS:
+                raise ValidationError({'ids': (
+                    f'Можно запросить не больше '
+                    f'{settings.TITLES_BULK_MAX_IDS} произведений.'
+                )})
+        ids = list(ids)
+        found = self.eager_load(self.get_queryset()).in_bulk(ids)
+        serializer = self.get_serializer(
+            [found[pk] for pk in ids if pk in found], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    @action(
+        detail=True, methods=['get'],
+        url_path='stats', url_name='stats',
+    )
+    def stats(self, request, pk=None):
+        """Рейтинг, количество оценок и гистограмма оценок произведения."""
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @action(
+        detail=False, methods=['get'],
+        url_path='facets', url_name='facets',
+    )
+    def facets(self, request):
+        """
+        Количество произведений по жанрам, категориям и годам
+        для текущих параметров фильтра. Для каждого фасета его
+        собственное условие не учитывается.
+        """
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.queryset, request=request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return Response(count_title_facets(filterset))
+
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(
+    AsyncReadMixin, CursorPaginationMixin, ValuesListMixin, EagerLoadingMixin,
+    viewsets.ModelViewSet
+):
     """
     Вьюсет модели Отзывов.
     """
@@ -157,6 +283,7 @@ class ReviewsViewSet(viewsets.ModelViewSet):
     permission_classes = (
         AuthorOrStaffOrReadOnly,
     )
+    cursor_pagination_class = PubDateCursorPagination
 
     def get_title(self):
         """Получаем произведение для отзыва."""
@@ -167,17 +294,30 @@ class ReviewsViewSet(viewsets.ModelViewSet):
         return self.get_title().reviews.all()
 
     def perform_create(self, serializer):
-        """Переопределяем метод create."""
-        serializer.save(title=self.get_title(), author=self.request.user,)
+        """
+        Произведение заранее не читаем: если его нет, обновление
+        рейтинга не находит строку и вставка отзыва откатывается.
+        """
+        try:
+            serializer.save(
+                title_id=self.kwargs.get('title_id'),
+                author=self.request.user,
+            )
+        except Title.DoesNotExist:
+            raise NotFound()
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(
+    AsyncReadMixin, CursorPaginationMixin, ValuesListMixin, EagerLoadingMixin,
+    viewsets.ModelViewSet
+):
     """
     Вьюсет модели Комментариев.
     """
 
     serializer_class = CommentSerializer
     permission_classes = (AuthorOrStaffOrReadOnly,)
+    cursor_pagination_class = PubDateCursorPagination
 
     def get_review(self):
         """Получаем отзыв для комментария."""
@@ -194,3 +334,93 @@ class CommentsViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Переопределяем метод create."""
         serializer.save(review=self.get_review(), author=self.request.user)
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка таблицы для аналитики в NDJSON или CSV (?output=csv).
+    since_id — только записи с большим id, since — опубликованные позже
+    указанного времени (для моделей с датой публикации).
+    """
+
+    permission_classes = (ChangeAdminOnly,)
+    queryset = None
+    serializer_class = None
+    parent_fields = {}
+    filename = None
+
+    def get(self, request):
+        queryset = self.filter_since(self.queryset.order_by('id'))
+        rows = export_rows(
+            queryset, self.serializer_class,
+            self.parent_fields, settings.EXPORT_CHUNK_SIZE
+        )
+        if request.query_params.get('output') == 'csv':
+            header = (
+                list(self.serializer_class().fields)
+                + list(self.parent_fields)
+            )
+            response = StreamingHttpResponse(
+                csv_lines(rows, header), content_type='text/csv'
+            )
+            extension = 'csv'
+        else:
+            response = StreamingHttpResponse(
+                ndjson_lines(rows), content_type='application/x-ndjson'
+            )
+            extension = 'ndjson'
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}.{extension}"'
+        )
+        return response
+
+    def filter_since(self, queryset):
+        since_id = self.request.query_params.get('since_id')
+        if since_id:
+            try:
+                since_id = int(since_id)
+            except ValueError:
+                raise ValidationError({'since_id': 'Ожидается целое число.'})
+            queryset = queryset.filter(id__gt=since_id)
+        since = self.request.query_params.get('since')
+        if since:
+            if not hasattr(queryset.model, 'pub_date'):
+                raise ValidationError(
+                    {'since': 'Для этой выгрузки используйте since_id.'}
+                )
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError(
+                    {'since': 'Ожидается дата и время в формате ISO 8601.'}
+                )
+            queryset = queryset.filter(pub_date__gt=since)
+        return queryset
+
+
+class TitleExport(ExportView):
+    """Выгрузка произведений."""
+
+    queryset = Title.objects.all()
+    serializer_class = TitleReciveSerializer
+    filename = 'titles'
+
+
+class ReviewExport(ExportView):
+    """Выгрузка отзывов."""
+
+    queryset = Review.objects.all()
+    serializer_class = ReviewsSerializer
+    parent_fields = {'title': 'title_id'}
+    filename = 'reviews'
+
+
+class CommentExport(ExportView):
+    """Выгрузка комментариев."""
+
+    queryset = Comment.objects.all()
+    serializer_class = CommentSerializer
+    parent_fields = {'review': 'review_id'}
+    filename = 'comments'
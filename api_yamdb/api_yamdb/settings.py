@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -48,12 +49,56 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Регистрация и выдача токена (api.throttling): с одного адреса
+    # и для одного username или email.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '60/min',
+        'auth_identity': '10/min',
+    },
+    # Число доверенных прокси перед приложением: адрес клиента для
+    # ограничений частоты берётся из X-Forwarded-For с учётом только
+    # их. 0 — используется REMOTE_ADDR, заголовок клиента не читается.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default='0')),
 }
 
+# Корзины токенов для ограничения частоты хранятся в памяти процесса.
+# Чтобы лимит был общим для процессов, укажите псевдоним общего кэша.
+AUTH_THROTTLE_CACHE_ALIAS = os.getenv('AUTH_THROTTLE_CACHE_ALIAS') or None
+AUTH_THROTTLE_MAX_BUCKETS = 100_000
+
+# Двоичные форматы ответов и тел запросов, если установлены их библиотеки.
+for module, renderer, parser in (
+    ('msgpack', 'api.renderers.MessagePackRenderer',
+     'api.parsers.MessagePackParser'),
+    ('cbor2', 'api.renderers.CBORRenderer', 'api.parsers.CBORParser'),
+):
+    if find_spec(module) is not None:
+        REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(renderer)
+        REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append(parser)
+
+# JWT_CLAIMS_AUTH=1: права проверяются по утверждениям токена (роль, имя,
+# is_superuser, is_active) без чтения пользователя из базы. Время отзыва
+# утверждений хранится в User.claims_revoked_at и кэшируется
+# в JWT_REVOCATION_CACHE_ALIAS на JWT_CLAIMS_CACHE_TIMEOUT секунд: с кэшем
+# в памяти процесса другие процессы узнают об отзыве не позже этого срока,
+# с общим кэшем — сразу.
+JWT_CLAIMS_AUTH = os.getenv('JWT_CLAIMS_AUTH', default='0') == '1'
+JWT_REVOCATION_CACHE_ALIAS = 'default'
+JWT_CLAIMS_CACHE_TIMEOUT = 30
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
@@ -112,6 +157,20 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'noreply@yamdb.ru'
 
+# Письма пишутся в очередь (users.OutboxEmail) в транзакции запроса.
+# EMAIL_OUTBOX_DELIVERY: 'thread' — фоновым потоком процесса, 'worker' —
+# только командой python manage.py send_outbox, 'on_commit' — сразу после
+# фиксации транзакции, в потоке запроса (соединение с почтой на каждое
+# письмо; подходит для разработки и тестов).
+EMAIL_OUTBOX_DELIVERY = os.getenv('EMAIL_OUTBOX_DELIVERY', default='thread')
+EMAIL_OUTBOX_BATCH_SIZE = 100
+# Пауза перед повтором (в секундах) удваивается с каждой неудачей.
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# На сколько секунд обработчик забирает пачку писем себе.
+EMAIL_OUTBOX_LEASE = 5 * 60
+EMAIL_OUTBOX_POLL_INTERVAL = 10
+
 
 DATABASES = {
     'default': {
@@ -120,6 +179,31 @@ DATABASES = {
     }
 }
 
+# Кэш ответов каталога произведений. Бэкенд подключаемый:
+# по умолчанию память процесса, для общего кэша между процессами
+# подойдёт, например, django.core.cache.backends.filebased.FileBasedCache.
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = 60 * 60
+# Не дольше стольких секунд копия справочников (категорий, жанров)
+# в памяти процесса отдаётся без перечитывания из базы.
+REFERENCE_CACHE_TIMEOUT = 60
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    CATALOG_CACHE_ALIAS: {
+        'BACKEND': os.getenv(
+            'CATALOG_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv(
+            'CATALOG_CACHE_LOCATION', default=str(BASE_DIR / 'cache')
+        ),
+        'TIMEOUT': CATALOG_CACHE_TIMEOUT,
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -160,7 +244,34 @@ MIN_SCORE_VALUE = 1
 MAX_SCORE_VALUE = 10
 MIN_CONFIRMATION_CODE_VALUE = 100000
 MAX_CONFIRMATION_CODE_VALUE = 999999
-SIGN_UP_USER_INDEX = 0
+
+# Коды подтверждения: signed — подписанные HMAC и не хранятся в базе,
+# stored — случайные, сохраняются в пользователе.
+CONFIRMATION_CODE_MODE = os.getenv('CONFIRMATION_CODE_MODE', default='signed')
+# Срок действия подписанного кода, секунды.
+CONFIRMATION_CODE_LIFETIME = 60 * 60
+# Повторная регистрация того же пользователя в течение стольких секунд
+# после письма с кодом не отправляет новое письмо. 0 — без паузы.
+SIGNUP_RESEND_COOLDOWN = 60
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Подсказки по названиям произведений.
+TITLE_AUTOCOMPLETE_LIMIT = 10
+TITLE_AUTOCOMPLETE_MAX_LIMIT = 50
+# Как часто (в секундах) индексы произведений в памяти (подсказки,
+# фасеты) перестраиваются в фоне, чтобы увидеть изменения других
+# процессов. None — только сигналы своего процесса.
+TITLE_INDEX_REFRESH = 5 * 60
+
+# Сколько произведений можно запросить одним titles/bulk/?ids=.
+TITLES_BULK_MAX_IDS = 100
+
+# Асинхронные view каталога: запросы на чтение выполняются в пуле
+# из ASYNC_READ_WORKERS потоков. Включается в asgi.py, под WSGI
+# обычные синхронные view быстрее.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', default='0') == '1'
+ASYNC_READ_WORKERS = int(os.getenv('ASYNC_READ_WORKERS', default=10))
 
 # Роли пользователей.
 USER = 'user'
@@ -0,0 +1,141 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from users.models import User
+
+# Утверждения access-токена, по которым права проверяются без базы.
+USER_CLAIMS = ('username', 'role', 'is_superuser', 'is_active')
+ISSUED_AT_CLAIM = 'iat'
+
+
+def claims_status_key(user_id):
+    return f'jwt-claims-status:{user_id}'
+
+
+def forget_claims_status(user_id):
+    """
+    Убираем статус пользователя из кэша сейчас и после фиксации
+    транзакции: иначе параллельный запрос успел бы закэшировать
+    статус, прочитанный до неё.
+    """
+    cache = caches[settings.JWT_REVOCATION_CACHE_ALIAS]
+    key = claims_status_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(partial(cache.delete, key))
+
+
+def revoke_token_claims(user_id):
+    """
+    Утверждения токенов пользователя, выданных до этого момента,
+    устарели: такие токены проверяются по строке пользователя в базе.
+    Время отзыва хранится в User.claims_revoked_at. Изменения ролей
+    через QuerySet.update() сигналов не вызывают — после них нужно
+    вызвать эту функцию самостоятельно.
+    """
+    revoked_at = timezone.now()
+    User.objects.filter(pk=user_id).update(claims_revoked_at=revoked_at)
+    forget_claims_status(user_id)
+    return revoked_at
+
+
+def get_claims_status(user_id):
+    """
+    Время отзыва утверждений (в секундах эпохи, 0 — не отзывались)
+    и активность пользователя. Читаются из базы одним запросом
+    по первичному ключу и держатся в кэше JWT_CLAIMS_CACHE_TIMEOUT
+    секунд. None — пользователя нет.
+    """
+    cache = caches[settings.JWT_REVOCATION_CACHE_ALIAS]
+    key = claims_status_key(user_id)
+    status = cache.get(key)
+    if status is None:
+        try:
+            revoked_at, is_active = User.objects.values_list(
+                'claims_revoked_at', 'is_active'
+            ).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        status = (revoked_at.timestamp() if revoked_at else 0, is_active)
+        cache.set(key, status, settings.JWT_CLAIMS_CACHE_TIMEOUT)
+    return status
+
+
+def has_fresh_claims(token):
+    """
+    Можно ли верить утверждениям токена. Если пользователя нет,
+    он заблокирован или статус неизвестен, токен проверяется по базе.
+    """
+    if any(
+        claim not in token for claim in USER_CLAIMS + (ISSUED_AT_CLAIM,)
+    ):
+        return False
+    status = get_claims_status(token[api_settings.USER_ID_CLAIM])
+    if status is None:
+        return False
+    revoked_at, is_active = status
+    return is_active and token[ISSUED_AT_CLAIM] > revoked_at
+
+
+def claim_property(name, claim=None):
+    """
+    Атрибут пользователя из утверждения токена, пока пользователь
+    не загружен, и из загруженного пользователя после этого.
+    """
+
+    def getter(self):
+        if self._wrapped is empty:
+            return self.token[claim or name]
+        return getattr(self._wrapped, name)
+
+    return property(getter)
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    Пользователь из утверждений access-токена: id, username, роль,
+    is_superuser и is_active известны без запроса к базе, поэтому
+    их хватает для проверки прав. Любой другой атрибут (или передача
+    объекта в ORM) загружает пользователя из базы при первом обращении.
+    """
+
+    is_anonymous = False
+    is_authenticated = True
+
+    is_user = User.is_user
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+
+    pk = id = claim_property('id', api_settings.USER_ID_CLAIM)
+    username = claim_property('username')
+    role = claim_property('role')
+    is_superuser = claim_property('is_superuser')
+    is_active = claim_property('is_active')
+
+    def __init__(self, token, load_user):
+        super().__init__(load_user)
+        self.__dict__['token'] = token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без чтения пользователя на каждый запрос.
+    Токен с актуальными утверждениями (см. get_tokens_for_user)
+    даёт TokenUser; токен без них, выданный до изменения роли
+    или принадлежащий удалённому либо заблокированному пользователю,
+    проверяется по базе, как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.JWT_CLAIMS_AUTH or not has_fresh_claims(
+            validated_token
+        ):
+            return super().get_user(validated_token)
+        return TokenUser(
+            validated_token, partial(super().get_user, validated_token)
+        )
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+SIGNED = 'signed'
+STORED = 'stored'
+
+KEY_SALT = 'auth.confirmation_code'
+HASH_LENGTH = 20
+
+
+def signature(user, timestamp):
+    return salted_hmac(
+        KEY_SALT,
+        f'{user.pk}:{user.email}:{timestamp}',
+        algorithm='sha256',
+    ).hexdigest()[:HASH_LENGTH]
+
+
+def make_confirmation_code(user, timestamp=None):
+    """
+    Подписанный код подтверждения: время выдачи и HMAC от id, email
+    пользователя и этого времени на SECRET_KEY. Хранить его не нужно,
+    после смены email код перестаёт подходить.
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    return f'{int_to_base36(timestamp)}-{signature(user, timestamp)}'
+
+
+def check_confirmation_code(user, code):
+    """Проверяем код пользователя и срок его действия."""
+    if settings.CONFIRMATION_CODE_MODE == STORED:
+        return constant_time_compare(code, user.confirmation_code or '')
+    try:
+        timestamp, sign = code.split('-')
+        timestamp = base36_to_int(timestamp)
+    except ValueError:
+        return False
+    age = int(time.time()) - timestamp
+    if not 0 <= age <= settings.CONFIRMATION_CODE_LIFETIME:
+        return False
+    return constant_time_compare(sign, signature(user, timestamp))
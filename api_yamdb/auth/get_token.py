@@ -1,8 +1,16 @@
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from auth.authentication import ISSUED_AT_CLAIM, USER_CLAIMS
 
 
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
+    # Роль и имя в токене избавляют ClaimsJWTAuthentication
+    # от чтения пользователя на каждый запрос.
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    refresh[ISSUED_AT_CLAIM] = datetime_to_epoch(refresh.current_time)
 
     return {
         'refresh': str(refresh),
@@ -1,23 +1,57 @@
 import secrets
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.cache import cache
+from users.outbox import enqueue_mail
 
+from auth.confirmation_code import STORED, make_confirmation_code
 
 rnd = secrets.SystemRandom()
 
 
-def send_mail_with_code(data):
-    email = data['email']
-    confirmation_code = rnd.randint(
-        settings.MIN_CONFIRMATION_CODE_VALUE,
-        settings.MAX_CONFIRMATION_CODE_VALUE
-    )
-    send_mail(
+def send_mail_with_code(user):
+    """
+    Выдаём пользователю код подтверждения и ставим письмо с ним
+    в очередь. Подписанный код не хранится, случайный (режим
+    CONFIRMATION_CODE_MODE=stored) сохраняется в пользователе.
+    """
+    if settings.CONFIRMATION_CODE_MODE == STORED:
+        confirmation_code = str(rnd.randint(
+            settings.MIN_CONFIRMATION_CODE_VALUE,
+            settings.MAX_CONFIRMATION_CODE_VALUE
+        ))
+        user.confirmation_code = confirmation_code
+        user.save(update_fields=('confirmation_code',))
+    else:
+        confirmation_code = make_confirmation_code(user)
+    enqueue_mail(
         'Код подтверждения',
         f'Ваш код подтверждения {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [email],
-        fail_silently=True
+        user.email,
+    )
+    return confirmation_code
+
+
+def resend_key(username):
+    return f'signup-resend:{username}'
+
+
+def in_resend_cooldown(username, email):
+    """Идёт ли пауза после письма с кодом этому пользователю."""
+    return bool(settings.SIGNUP_RESEND_COOLDOWN) and (
+        cache.get(resend_key(username)) == email
+    )
+
+
+def start_resend_cooldown(user):
+    """
+    Начинаем паузу SIGNUP_RESEND_COOLDOWN секунд перед повторной
+    отправкой кода пользователю. Возвращаем False, если пауза уже идёт
+    и письмо отправлять не нужно.
+    """
+    if not settings.SIGNUP_RESEND_COOLDOWN:
+        return True
+    return cache.add(
+        resend_key(user.username), user.email,
+        settings.SIGNUP_RESEND_COOLDOWN,
     )
-    return str(confirmation_code)
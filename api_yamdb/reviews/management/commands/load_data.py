@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from users.models import User
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import (data_loaded, rebuild_comment_counts,
+                             rebuild_score_distribution,
+                             rebuild_title_rating)
+
+GenreTitle = Title.genre.through
+
+# Файлы загружаются в порядке зависимостей. Для каждой колонки
+# с внешним ключом указаны поле модели и модель, на которую она ссылается.
+DATA_FILES = (
+    ('users.csv', User, {}),
+    ('category.csv', Category, {}),
+    ('genre.csv', Genre, {}),
+    ('titles.csv', Title, {'category': ('category_id', Category)}),
+    ('genre_title.csv', GenreTitle, {
+        'title_id': ('title_id', Title),
+        'genre_id': ('genre_id', Genre),
+    }),
+    ('review.csv', Review, {
+        'title_id': ('title_id', Title),
+        'author': ('author_id', User),
+    }),
+    ('comments.csv', Comment, {
+        'review_id': ('review_id', Review),
+        'author': ('author_id', User),
+    }),
+)
+CHECKPOINT_NAME = '.load_data_checkpoint.json'
+
+
+@contextmanager
+def keep_pub_date(*models):
+    """
+    bulk_create проставляет auto_now_add текущим временем.
+    На время загрузки отключаем его, чтобы сохранить даты из файлов.
+    """
+    fields = [
+        model._meta.get_field('pub_date') for model in models
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает CSV из static/data пакетами bulk_create. '
+        'С --resume продолжает прерванную загрузку с последнего пакета.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=str(Path(settings.BASE_DIR) / 'static/data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одном bulk_create и транзакции.',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить загрузку с сохранённой контрольной точки.',
+        )
+
+    def handle(self, *args, **options):
+        self.path = Path(options['path'])
+        self.batch_size = options['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.checkpoint_path = self.path / CHECKPOINT_NAME
+        self.resume = options['resume']
+        self.checkpoint = self.read_checkpoint() if self.resume else {}
+        self.known_ids = {}
+
+        with keep_pub_date(Review, Comment):
+            for filename, model, foreign_keys in DATA_FILES:
+                file_path = self.path / filename
+                if not file_path.exists():
+                    self.stdout.write(f'{filename}: файл не найден, пропуск')
+                    continue
+                self.load_file(file_path, model, foreign_keys)
+
+        self.reset_sequences()
+        rebuild_title_rating()
+        rebuild_score_distribution()
+        rebuild_comment_counts()
+        data_loaded.send(
+            sender=self.__class__,
+            models=[model for _, model, _ in DATA_FILES],
+        )
+        if self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    def load_file(self, file_path, model, foreign_keys):
+        done = self.checkpoint.get(file_path.name, 0)
+        if done == -1:
+            self.stdout.write(f'{file_path.name}: уже загружен, пропуск')
+            return
+        started = time.monotonic()
+        processed = inserted = skipped = 0
+        batch = []
+        with open(file_path, encoding='utf-8', newline='') as csv_file:
+            for processed, row in enumerate(csv.DictReader(csv_file), 1):
+                if processed <= done:
+                    continue
+                obj = self.build_object(model, foreign_keys, row)
+                if obj is None:
+                    skipped += 1
+                else:
+                    batch.append(obj)
+                if len(batch) >= self.batch_size:
+                    inserted += self.save_batch(model, batch)
+                    self.save_checkpoint(file_path.name, processed)
+                    batch = []
+        inserted += self.save_batch(model, batch)
+        self.save_checkpoint(file_path.name, -1)
+
+        elapsed = time.monotonic() - started
+        rate = inserted / elapsed if elapsed else inserted
+        self.stdout.write(
+            f'{file_path.name}: загружено {inserted}, пропущено {skipped} '
+            f'за {elapsed:.2f} с ({rate:.0f} строк/с)'
+        )
+
+    def build_object(self, model, foreign_keys, row):
+        """
+        Собираем объект модели из строки CSV. Внешние ключи проверяем
+        по множествам известных id; строку с битой ссылкой на
+        обязательное поле пропускаем.
+        """
+        values = {}
+        for column, raw in row.items():
+            if column in foreign_keys:
+                attname, related_model = foreign_keys[column]
+                field = model._meta.get_field(attname[:-len('_id')])
+                related_id = int(raw) if raw else None
+                if related_id not in self.get_known_ids(related_model):
+                    if not field.null:
+                        return None
+                    related_id = None
+                values[attname] = related_id
+                continue
+            field = model._meta.get_field(column)
+            if raw == '' and field.null:
+                values[field.attname] = None
+            else:
+                values[field.attname] = field.to_python(raw)
+        if model is User:
+            values['password'] = make_password(None)
+        return model(**values)
+
+    def get_known_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def save_batch(self, model, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=self.resume)
+        if model in self.known_ids:
+            self.known_ids[model].update(obj.pk for obj in batch)
+        return len(batch)
+
+    def read_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return {}
+        with open(self.checkpoint_path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def save_checkpoint(self, filename, processed):
+        """Контрольная точка: сколько строк файла уже зафиксировано."""
+        self.checkpoint[filename] = processed
+        temp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.checkpoint, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def reset_sequences(self):
+        """Строки вставлены с явными id: сдвигаем последовательности."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [model for _, model, _ in DATA_FILES]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
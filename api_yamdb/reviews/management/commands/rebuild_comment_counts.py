@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.signals import rebuild_comment_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количество комментариев и дату последнего '
+        'комментария у всех отзывов.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны счётчики отзывов: {updated}')
+        )
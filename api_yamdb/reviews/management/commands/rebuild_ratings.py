@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.signals import rebuild_title_rating
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённый рейтинг всех произведений.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_title_rating()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг произведений: {updated}')
+        )
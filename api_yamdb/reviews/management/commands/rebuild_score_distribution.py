@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.signals import rebuild_score_distribution
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает гистограммы оценок всех произведений '
+        'одним проходом по таблице отзывов.'
+    )
+
+    def handle(self, *args, **options):
+        inserted = rebuild_score_distribution()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитаны счётчики оценок: {inserted}')
+        )
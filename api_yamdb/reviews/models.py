@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 
 from reviews.validators import check_future_year
@@ -16,7 +16,7 @@ class TimeDateModelMixin(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ('-pub_date')
+        ordering = ('-pub_date',)
 
     def __str__(self):
         """Возвращаем укороченный текст модели."""
@@ -67,6 +67,9 @@ class Genre(CategoryGenreModelMixin):
 class Title(models.Model):
     """Модель произведений."""
 
+    # Поля, которые поддерживают сигналы отзывов.
+    RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
+
     name = models.CharField(
         verbose_name='Название произведения',
         max_length=200,
@@ -97,17 +100,91 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанры'
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get(
+            'update_fields'
+        ) is None:
+            # Рейтинг меняют только сигналы отзывов: не перезаписываем
+            # его значениями, загруженными вместе с произведением.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class FullTextField(models.TextField):
+    """Скрытая колонка FTS5 с именем таблицы: по ней делается MATCH."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TitleSearch(models.Model):
+    """
+    Полнотекстовый индекс произведений: виртуальная таблица SQLite FTS5
+    из миграции 0032, которую поддерживают триггеры на reviews_title.
+    Через связь search_index произведения фильтруются по MATCH
+    и сортируются по рангу BM25 за один проход по индексу.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_column='rowid',
+        primary_key=True,
+        related_name='search_index',
+    )
+    document = FullTextField(db_column='reviews_title_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
 
 class Review(TimeDateModelMixin):
     """Модель отзывов."""
+
+    # Поля, которые поддерживают сигналы комментариев.
+    COMMENT_FIELDS = ('comment_count', 'last_comment_at')
+
     text = models.TextField(
         verbose_name='Текст',
         help_text='Введите ваш текст!',
@@ -139,8 +216,19 @@ class Review(TimeDateModelMixin):
             ),
         ),
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name='Дата последнего комментария',
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
-    class Meta:
+    class Meta(TimeDateModelMixin.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         constraints = [
@@ -152,6 +240,76 @@ class Review(TimeDateModelMixin):
                 name='unique_author_title',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Сохраняем отзыв и рейтинг произведения в одной транзакции."""
+        if not self._state.adding and not args and kwargs.get(
+            'update_fields'
+        ) is None:
+            # Счётчики комментариев меняют только сигналы комментариев:
+            # не перезаписываем их значениями, загруженными раньше.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COMMENT_FIELDS
+            ]
+        using = kwargs.get('using')
+        with transaction.atomic(using=using):
+            if not self._state.adding:
+                # Прежнюю оценку для пересчёта рейтинга читаем под
+                # блокировкой строки: параллельные правки отзыва
+                # не посчитают разницу от одной и той же оценки.
+                self._loaded_rating = next(iter(
+                    Review.objects.using(using).select_for_update().filter(
+                        pk=self.pk
+                    ).values_list('title_id', 'score')
+                ), (None, None))
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+
+class TitleScore(models.Model):
+    """Счётчик оценок одного значения у произведения (гистограмма)."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='scores',
+        verbose_name='Произведение',
+    )
+    score = models.SmallIntegerField(
+        verbose_name='Оценка',
+        validators=(
+            MinValueValidator(settings.MIN_SCORE_VALUE),
+            MaxValueValidator(settings.MAX_SCORE_VALUE),
+        ),
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Счётчик оценок'
+        verbose_name_plural = 'Счётчики оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} × {self.count}'
 
 
 class Comment(TimeDateModelMixin):
@@ -174,6 +332,21 @@ class Comment(TimeDateModelMixin):
         verbose_name='Комментарии к отзыву',
     )
 
-    class Meta:
+    class Meta(TimeDateModelMixin.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Сохраняем комментарий и счётчик отзыва в одной транзакции."""
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
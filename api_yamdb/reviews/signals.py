@@ -0,0 +1,201 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (Case, Count, F, FloatField, IntegerField, Max,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from reviews.models import Comment, Review, Title, TitleScore
+
+# Рейтинг произведения изменился. title_id=None — пересчитаны все.
+rating_changed = Signal()
+# Данные загружены в обход сигналов моделей (bulk_create): models.
+data_loaded = Signal()
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """
+    Изменяем сумму и количество оценок произведения одним UPDATE
+    и пересчитываем сохранённый рейтинг.
+    """
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    updated = Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=Cast(rating_sum, FloatField()) / NullIf(rating_count, 0),
+    )
+    rating_changed.send(sender=Title, title_id=title_id)
+    return updated
+
+
+def rebuild_title_rating(title_id=None):
+    """
+    Пересчитываем рейтинг по таблице отзывов одним UPDATE
+    для одного произведения или для всех сразу.
+    """
+    titles = Title.objects.all()
+    if title_id is not None:
+        titles = titles.filter(pk=title_id)
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+        rating=Subquery(
+            reviews.annotate(
+                average=Cast(Sum('score'), FloatField()) / Count('pk')
+            ).values('average'),
+            output_field=FloatField(),
+        ),
+    )
+    rating_changed.send(sender=Title, title_id=title_id)
+    return updated
+
+
+def update_score_count(title_id, score, delta):
+    """Меняем счётчик оценки score у произведения на delta."""
+    scores = TitleScore.objects.filter(title_id=title_id, score=score)
+    if scores.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScore.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        # Счётчик успели создать в параллельной транзакции.
+        scores.update(count=F('count') + delta)
+
+
+def rebuild_score_distribution(title_id=None):
+    """
+    Пересчитываем гистограммы оценок одним INSERT ... SELECT
+    с группировкой по таблице отзывов: для одного произведения
+    или для всех сразу.
+    """
+    scores = TitleScore.objects.all()
+    reviews = Review.objects.order_by()
+    if title_id is not None:
+        scores = scores.filter(title_id=title_id)
+        reviews = reviews.filter(title_id=title_id)
+    select, params = reviews.values('title_id', 'score').annotate(
+        total=Count('pk')
+    ).query.sql_with_params()
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        scores.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {} ({}, {}, {}) {}'.format(
+                    quote(TitleScore._meta.db_table), quote('title_id'),
+                    quote('score'), quote('count'), select,
+                ),
+                params,
+            )
+            inserted = cursor.rowcount
+    rating_changed.send(sender=Title, title_id=title_id)
+    return inserted
+
+
+def rebuild_comment_counts(review_id=None):
+    """
+    Пересчитываем количество комментариев и дату последнего из них
+    одним UPDATE для одного отзыва или для всех сразу.
+    """
+    reviews = Review.objects.all()
+    if review_id is not None:
+        reviews = reviews.filter(pk=review_id)
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review')
+    return reviews.update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total')),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+        last_comment_at=Subquery(
+            comments.annotate(latest=Max('pub_date')).values('latest')
+        ),
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Учитываем новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_loaded_rating', (None, None)
+    )
+    if created:
+        if not update_title_rating(instance.title_id, instance.score, 1):
+            # Save идёт в транзакции: отзыв без произведения откатится.
+            raise Title.DoesNotExist(
+                f'Произведение {instance.title_id} не найдено.'
+            )
+        update_score_count(instance.title_id, instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        # Прежняя оценка неизвестна: пересчитываем рейтинг по отзывам.
+        rebuild_title_rating(instance.title_id)
+        rebuild_score_distribution(instance.title_id)
+    elif old_title_id != instance.title_id:
+        update_title_rating(old_title_id, -old_score, -1)
+        update_score_count(old_title_id, old_score, -1)
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_score_count(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        update_title_rating(
+            instance.title_id, instance.score - old_score, 0
+        )
+        update_score_count(instance.title_id, old_score, -1)
+        update_score_count(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Убираем оценку удалённого отзыва из рейтинга произведения."""
+    update_title_rating(instance.title_id, -instance.score, -1)
+    update_score_count(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Учитываем новый комментарий в счётчике отзыва."""
+    if raw or not created:
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=Case(
+            When(
+                last_comment_at__gte=instance.pub_date,
+                then=F('last_comment_at'),
+            ),
+            default=Value(instance.pub_date),
+        ),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Убираем удалённый комментарий из счётчика отзыва. Срабатывает
+    и при каскадном удалении (вместе с отзывом или автором).
+    """
+    latest = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by('-pub_date').values('pub_date')[:1]
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1,
+        last_comment_at=Subquery(latest),
+    )
@@ -1,5 +1,10 @@
 from django.contrib import admin
 
-from users.models import User
+from users.models import OutboxEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'created', 'attempts', 'next_attempt_at')
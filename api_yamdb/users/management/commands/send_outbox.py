@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение '
+        'с почтовым сервером. Без --once работает, пока его не остановят.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить письма, срок которых наступил, и завершиться.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем в одной пачке.',
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза (в секундах), когда очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.drain(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}'
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_outbox(batch_size)
+            if not sent and not failed:
+                return total_sent, total_failed
+            total_sent += sent
+            total_failed += failed
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='claims_revoked_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Токены, выданные раньше, проверяются по базе.', null=True, verbose_name='Утверждения токенов отозваны'),
+        ),
+    ]
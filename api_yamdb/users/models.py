@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class UserRole(models.TextChoices):
@@ -35,9 +36,30 @@ class User(AbstractUser):
         blank=False,
         default='XXXX'
     )
+    claims_revoked_at = models.DateTimeField(
+        'Утверждения токенов отозваны',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Токены, выданные раньше, проверяются по базе.',
+    )
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
+    # Поля, от которых зависят утверждения JWT: при их изменении
+    # выданные токены проверяются по базе (см. users.signals).
+    TOKEN_CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.loaded_token_claims = user.token_claims()
+        return user
+
+    def token_claims(self):
+        return tuple(
+            self.__dict__.get(name) for name in self.TOKEN_CLAIM_FIELDS
+        )
 
     @property
     def is_user(self):
@@ -58,3 +80,45 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Записывается в той же транзакции,
+    что и данные, к которым относится, и удаляется после отправки.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки', default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+        null=True,
+        blank=True,
+        help_text='Пусто — попытки исчерпаны.',
+    )
+    claim = models.CharField(
+        'Метка обработчика', max_length=32, blank=True, default=''
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outbox_next_attempt_idx',
+            ),
+            models.Index(fields=['claim'], name='outbox_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
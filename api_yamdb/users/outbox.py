@@ -0,0 +1,167 @@
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+ON_COMMIT = 'on_commit'
+THREAD = 'thread'
+WORKER = 'worker'
+
+
+def enqueue_mail(subject, body, to, from_email=None):
+    """
+    Ставим письмо в очередь в текущей транзакции. Если транзакция
+    откатится, письмо не уйдёт. Когда его отправить, решает
+    EMAIL_OUTBOX_DELIVERY.
+    """
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+    delivery = settings.EMAIL_OUTBOX_DELIVERY
+    if delivery == ON_COMMIT:
+        transaction.on_commit(deliver_outbox)
+    elif delivery == THREAD:
+        transaction.on_commit(outbox_worker.wake)
+    return email
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: удваивается с каждой неудачей."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Забираем пачку писем, срок отправки которых наступил. Забранные
+    письма помечаются меткой и откладываются на EMAIL_OUTBOX_LEASE
+    секунд, поэтому параллельные обработчики их не возьмут, а письма
+    упавшего обработчика вернутся в очередь.
+    """
+    now = timezone.now()
+    emails = list(OutboxEmail.objects.filter(
+        next_attempt_at__lte=now
+    ).order_by('next_attempt_at', 'id')[:batch_size])
+    if not emails:
+        return []
+    claim = uuid.uuid4().hex
+    claimed = OutboxEmail.objects.filter(
+        pk__in=[email.pk for email in emails], next_attempt_at__lte=now
+    ).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+    )
+    if claimed == len(emails):
+        return emails
+    # Часть писем успел забрать другой обработчик.
+    return list(OutboxEmail.objects.filter(claim=claim))
+
+
+def send_batch(emails, mail_connection):
+    """Отправляем пачку через одно соединение; возвращаем ошибки по id."""
+    errors = {}
+    try:
+        mail_connection.open()
+    except Exception as exc:
+        return {email.pk: exc for email in emails}
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, [email.to],
+                connection=mail_connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                errors[email.pk] = exc
+    finally:
+        mail_connection.close()
+    return errors
+
+
+def save_failures(emails, errors):
+    now = timezone.now()
+    for email in emails:
+        if email.pk not in errors:
+            continue
+        email.attempts += 1
+        email.claim = ''
+        email.last_error = repr(errors[email.pk])
+        email.next_attempt_at = (
+            now + retry_delay(email.attempts)
+            if email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            else None
+        )
+    OutboxEmail.objects.bulk_update(
+        [email for email in emails if email.pk in errors],
+        ['attempts', 'claim', 'last_error', 'next_attempt_at'],
+    )
+
+
+def deliver_outbox(batch_size=None, mail_connection=None):
+    """
+    Отправляем одну пачку писем из очереди через одно соединение
+    с почтовым сервером. Отправленные письма удаляются, неудачные
+    откладываются с растущей паузой. Возвращаем (отправлено, ошибок).
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    errors = send_batch(emails, mail_connection or get_connection())
+    OutboxEmail.objects.filter(pk__in=[
+        email.pk for email in emails if email.pk not in errors
+    ]).delete()
+    save_failures(emails, errors)
+    return len(emails) - len(errors), len(errors)
+
+
+class OutboxWorker:
+    """
+    Фоновый поток процесса, который отправляет письма из очереди.
+    Просыпается после фиксации транзакции с новым письмом и раз
+    в EMAIL_OUTBOX_POLL_INTERVAL секунд — за отложенными повторами.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wake(self):
+        self._wakeup.set()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='email-outbox', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.EMAIL_OUTBOX_POLL_INTERVAL)
+            self._wakeup.clear()
+            try:
+                while deliver_outbox() != (0, 0):
+                    pass
+            except Exception:
+                # Поток не должен завершаться из-за ошибки базы: письма
+                # останутся в очереди до следующего пробуждения.
+                logger.exception('Не удалось отправить письма из очереди')
+            finally:
+                connection.close()
+
+
+outbox_worker = OutboxWorker()
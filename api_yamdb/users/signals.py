@@ -0,0 +1,28 @@
+from auth.authentication import forget_claims_status, revoke_token_claims
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """
+    Роль, имя, статус суперпользователя или активность изменились:
+    утверждения выданных токенов больше не верны. Изменения через
+    QuerySet.update() сигналов не вызывают — после них нужно вызвать
+    revoke_token_claims самостоятельно.
+    """
+    claims = instance.token_claims()
+    if not created and claims != getattr(
+        instance, 'loaded_token_claims', None
+    ):
+        instance.claims_revoked_at = revoke_token_claims(instance.pk)
+    instance.loaded_token_claims = claims
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Строки больше нет: токены пользователя проверяются по базе
+    # и отклоняются, как только статус уйдёт из кэша.
+    forget_claims_status(instance.pk)
@@ -0,0 +1,184 @@
+"""
+Пропускная способность при одновременных соединениях: WSGI
+(пул из ASYNC_READ_WORKERS потоков, как gthread у gunicorn) против
+ASGI с обычными синхронными view и с асинхронными view каталога.
+Сервер эмулируется в процессе: каждый ответ «медленный клиент»
+читает DELAY секунд, под WSGI всё это время занят поток. Каждый
+запрос к SQLite дополнительно ждёт DB_LATENCY секунд, как сетевая
+база данных.
+python -m benchmarks.bench_async_views [соединений] [запросов]
+"""
+import asyncio
+import importlib
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import quote, urlsplit
+
+from benchmarks.common import seed_catalog, setup_django
+
+TITLES = 2000
+# Сколько секунд клиент читает ответ.
+DELAY = 0.2
+# Задержка сети до базы данных на каждый запрос.
+DB_LATENCY = 0.002
+
+
+def make_urls(requests, seed=1):
+    rnd = random.Random(seed)
+    urls = []
+    for _ in range(requests):
+        title = rnd.randint(1, TITLES)
+        urls.append(rnd.choice((
+            f'/api/v1/titles/?page={rnd.randint(1, 100)}',
+            f'/api/v1/titles/{title}/',
+            f'/api/v1/titles/{title}/reviews/',
+            '/api/v1/categories/',
+            f'/api/v1/genres/?search={quote(f"жанр {rnd.randint(1, 15)}")}',
+        )))
+    return urls
+
+
+def add_db_latency(sender, connection, **kwargs):
+    def execute(execute, sql, params, many, context):
+        time.sleep(DB_LATENCY)
+        return execute(sql, params, many, context)
+
+    connection.execute_wrappers.append(execute)
+
+
+def use_async_views(enabled):
+    """Пересобираем URL-конфигурацию: as_view читает настройку при импорте."""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.ASYNC_READ_VIEWS = enabled
+    clear_url_caches()
+    import api.urls
+    import api_yamdb.urls
+    importlib.reload(api.urls)
+    importlib.reload(api_yamdb.urls)
+
+
+def run_wsgi(urls, connections, workers):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(url):
+        parts = urlsplit(url)
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': parts.path,
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(),
+        }
+        statuses = []
+        body = handler(environ, lambda status, headers: statuses.append(
+            status
+        ))
+        try:
+            for _ in body:
+                pass
+            time.sleep(DELAY)
+        finally:
+            body.close()
+        return statuses[0]
+
+    # Соединения ждут в очереди сервера, обслуживают их workers потоков.
+    with ThreadPoolExecutor(max_workers=min(connections, workers)) as pool:
+        return list(pool.map(request, urls))
+
+
+def run_asgi(urls, connections):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+
+    async def request(url):
+        parts = urlsplit(url)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': parts.path,
+            'query_string': parts.query.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 1),
+            'server': ('testserver', 80),
+        }
+        statuses = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(DELAY)
+
+        await handler(scope, receive, send)
+        return statuses[0]
+
+    async def main():
+        queue = list(reversed(urls))
+        statuses = []
+
+        async def connection():
+            while queue:
+                statuses.append(await request(queue.pop()))
+
+        await asyncio.gather(*(connection() for _ in range(connections)))
+        return statuses
+
+    return asyncio.run(main())
+
+
+def main(connections, requests):
+    setup_django()
+    seed_catalog(titles=TITLES, reviews_per_title=3)
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connections as databases
+    from django.db.backends.signals import connection_created
+
+    databases.close_all()
+    connection_created.connect(add_db_latency)
+    urls = make_urls(requests)
+    workers = settings.ASYNC_READ_WORKERS
+    modes = (
+        ('wsgi', False, lambda: run_wsgi(urls, connections, workers)),
+        ('asgi sync', False, lambda: run_asgi(urls, connections)),
+        ('asgi async', True, lambda: run_asgi(urls, connections)),
+    )
+    print(
+        f'{connections} соединений, {requests} запросов, '
+        f'{workers} потоков, клиент читает ответ {DELAY * 1000:.0f} ms, '
+        f'задержка базы {DB_LATENCY * 1000:.0f} ms'
+    )
+    for label, async_views, run in modes:
+        use_async_views(async_views)
+        for cache in caches.all():
+            cache.clear()
+        started = time.perf_counter()
+        statuses = run()
+        elapsed = time.perf_counter() - started
+        assert all(str(status).startswith('200') for status in statuses)
+        print(f'{label:<12}{requests / elapsed:8.0f} запросов/с')
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
@@ -0,0 +1,67 @@
+"""
+Двоичные форматы ответов: размер и время кодирования MessagePack
+и CBOR против JSON на страницах TitleReciveSerializer и отзывов.
+python -m benchmarks.bench_binary_formats [количество произведений]
+"""
+import sys
+from io import BytesIO
+
+from benchmarks.common import measure, seed_catalog, setup_django
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles, reviews_per_title=3)
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from reviews.models import Review, Title
+
+    from api.parsers import CBORParser, FastJSONParser, MessagePackParser
+    from api.renderers import (CBORRenderer, FastJSONRenderer,
+                               MessagePackRenderer, cbor2, msgpack)
+    from api.serializers import ReviewsSerializer, TitleReciveSerializer
+
+    assert msgpack is not None and cbor2 is not None, (
+        'msgpack и cbor2 не установлены'
+    )
+    context = {'request': Request(APIRequestFactory().get('/'))}
+    payloads = {
+        f'titles x{size}': {'results': TitleReciveSerializer(
+            Title.objects.prefetch_related('genre').select_related(
+                'category'
+            )[:size], many=True, context=context,
+        ).data}
+        for size in (5, 100, 1000)
+    }
+    payloads['reviews x1000'] = {'results': ReviewsSerializer(
+        Review.objects.select_related('author')[:1000], many=True,
+        context=context,
+    ).data}
+    formats = (
+        ('json', JSONRenderer(), JSONParser()),
+        ('orjson', FastJSONRenderer(), FastJSONParser()),
+        ('msgpack', MessagePackRenderer(), MessagePackParser()),
+        ('cbor', CBORRenderer(), CBORParser()),
+    )
+
+    for name, payload in payloads.items():
+        print(name)
+        json_size = len(JSONRenderer().render(payload))
+        for label, renderer, parser in formats:
+            content = renderer.render(payload)
+            encode, _ = measure(lambda: renderer.render(payload), repeat=50)
+            decode, _ = measure(
+                lambda: parser.parse(BytesIO(content)), repeat=50
+            )
+            print(
+                f'  {label:<8}{len(content) / 1024:8.1f} KiB '
+                f'{len(content) / json_size:6.0%}'
+                f'   encode {encode:7.3f} ms   decode {decode:7.3f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,57 @@
+"""
+Сборка списка из values() против DRF-сериализаторов:
+сериализаций объектов в секунду на странице из 100 строк.
+python -m benchmarks.bench_fast_serializers [количество произведений]
+"""
+import sys
+
+from benchmarks.common import measure, seed_catalog, setup_django
+
+PAGE = 100
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles, reviews_per_title=3)
+
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from reviews.models import Review, Title
+
+    from api.fastpath import compile_plan
+    from api.mixins import get_eager_loading
+    from api.serializers import ReviewsSerializer, TitleReciveSerializer
+
+    context = {'request': Request(APIRequestFactory().get('/'))}
+    print(f'Страница: {PAGE} строк')
+    for serializer_class, queryset in (
+        (TitleReciveSerializer, Title.objects.order_by('id')),
+        (ReviewsSerializer, Review.objects.order_by('id')),
+    ):
+        serializer = serializer_class(context=context)
+        select, prefetch, columns = get_eager_loading(
+            queryset.model, serializer.fields
+        )
+        plan = compile_plan(serializer)
+
+        def drf():
+            page = queryset.select_related(*select).prefetch_related(
+                *prefetch
+            ).only(*columns)[:PAGE]
+            return serializer_class(page, many=True, context=context).data
+
+        def values():
+            return plan.serialize(
+                list(queryset.values(*plan.columns)[:PAGE])
+            )
+
+        assert drf() == values()
+        name = serializer_class.__name__
+        for label, func in (('drf', drf), ('values', values)):
+            median, p99 = measure(func, repeat=200)
+            print(f'{name:<24}{label:<8} median {median:7.3f} ms   '
+                  f'{PAGE / median * 1000:9.0f} объектов/с')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,64 @@
+"""
+Рендеринг ответов: FastJSONRenderer (orjson) против JSONRenderer DRF
+на страницах TitleReciveSerializer разного размера.
+python -m benchmarks.bench_json_renderer [количество произведений]
+"""
+import sys
+from io import BytesIO
+
+from benchmarks.common import measure, seed_catalog, setup_django
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles, reviews_per_title=3)
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from reviews.models import Review, Title
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import ReviewsSerializer, TitleReciveSerializer
+
+    assert orjson is not None, 'orjson не установлен'
+    context = {'request': Request(APIRequestFactory().get('/'))}
+    payloads = {
+        f'titles x{size}': {'results': TitleReciveSerializer(
+            Title.objects.prefetch_related('genre').select_related(
+                'category'
+            )[:size], many=True, context=context,
+        ).data}
+        for size in (5, 100, 1000)
+    }
+    payloads['reviews x1000'] = {'results': ReviewsSerializer(
+        Review.objects.select_related('author')[:1000], many=True,
+        context=context,
+    ).data}
+
+    for name, payload in payloads.items():
+        size = len(JSONRenderer().render(payload))
+        assert FastJSONRenderer().render(payload) == (
+            JSONRenderer().render(payload)
+        )
+        line = f'{name:<16}{size / 1024:8.0f} KiB'
+        for label, renderer in (
+            ('stdlib', JSONRenderer()), ('orjson', FastJSONRenderer())
+        ):
+            median, _ = measure(lambda: renderer.render(payload), repeat=100)
+            throughput = size / median * 1000 / 2 ** 20
+            line += f'   {label} {median:7.3f} ms {throughput:5.0f} MiB/s'
+        print(line)
+
+    body = JSONRenderer().render(payloads['titles x1000'])
+    for label, parser in (
+        ('stdlib', JSONParser()), ('orjson', FastJSONParser())
+    ):
+        median, _ = measure(lambda: parser.parse(BytesIO(body)), repeat=100)
+        print(f'parse titles x1000 {label} {median:7.3f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
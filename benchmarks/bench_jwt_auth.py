@@ -0,0 +1,73 @@
+"""
+Запросы в секунду с JWT: проверка прав по утверждениям токена
+(ClaimsJWTAuthentication) против чтения пользователя из базы на каждый
+запрос. Запросы идут последовательно через WSGI-обработчик Django;
+справочник категорий отдаётся из памяти, поэтому чтение пользователя —
+единственный запрос к базе. Вторая серия — с задержкой DB_LATENCY
+секунд на запрос, как у сетевой базы данных.
+python -m benchmarks.bench_jwt_auth [запросов]
+"""
+import sys
+import time
+from functools import partial
+
+from benchmarks.common import seed_catalog, setup_django
+
+DB_LATENCY = 0.001
+
+
+def add_db_latency(latency, execute, sql, params, many, context):
+    if latency:
+        time.sleep(latency)
+    return execute(sql, params, many, context)
+
+
+def count_query(queries, execute, sql, params, many, context):
+    queries.append(sql)
+    return execute(sql, params, many, context)
+
+
+def run(client, url, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - started)
+
+
+def main(requests):
+    setup_django()
+    seed_catalog(titles=100)
+
+    from auth.get_token import get_tokens_for_user
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework.test import APIClient
+    from users.models import User
+
+    user = User.objects.create(username='bench', email='bench@yamdb.fake')
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["access"]}'
+    )
+    url = '/api/v1/categories/'
+    client.get(url)
+
+    print(f'{requests} запросов GET {url}')
+    for latency in (0, DB_LATENCY):
+        for label, claims in (('база', False), ('утверждения', True)):
+            settings.JWT_CLAIMS_AUTH = claims
+            with connection.execute_wrapper(partial(add_db_latency, latency)):
+                run(client, url, requests // 10)
+                rate = run(client, url, requests)
+            queries = []
+            with connection.execute_wrapper(partial(count_query, queries)):
+                client.get(url)
+            print(
+                f'{label:<12} задержка базы {latency * 1000:.0f} ms'
+                f'{rate:8.0f} запросов/с   запросов к базе: {len(queries)}'
+            )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
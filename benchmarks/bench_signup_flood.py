@@ -0,0 +1,86 @@
+"""
+Нагрузочный тест: поток регистраций от ботов с нескольких адресов
+(каждый бот перебирает свои username и email) и подбор кода
+подтверждения для одного пользователя. Считаем, сколько запросов
+к базе выполнили принятые и отклонённые ограничением частоты
+регистрации, с ограничением и без него. Письма остаются в очереди.
+python -m benchmarks.bench_signup_flood [запросов] [адресов]
+"""
+import sys
+import time
+from functools import partial
+
+from benchmarks.common import setup_django
+
+
+def count_query(queries, execute, sql, params, many, context):
+    queries.append(sql)
+    return execute(sql, params, many, context)
+
+
+def flood(client, requests, addresses):
+    """Возвращаем {статус: [число запросов к базе, ...]} и время."""
+    from django.db import connection
+
+    results = {}
+    started = time.perf_counter()
+    for number in range(requests):
+        if number % 2:
+            url, data = '/api/v1/auth/token/', {
+                'username': 'victim', 'confirmation_code': f'{number}',
+            }
+        else:
+            url, data = '/api/v1/auth/signup/', {
+                'username': f'bot{number}', 'email': f'bot{number}@bots.fake',
+            }
+        queries = []
+        with connection.execute_wrapper(partial(count_query, queries)):
+            response = client.post(
+                url, data, REMOTE_ADDR=f'10.0.0.{number % addresses}'
+            )
+        results.setdefault(response.status_code, []).append(len(queries))
+    return results, time.perf_counter() - started
+
+
+def main(requests, addresses):
+    setup_django()
+
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework.settings import api_settings
+    from users.models import User
+
+    from api.throttling import buckets
+
+    settings.EMAIL_OUTBOX_DELIVERY = 'worker'
+    User.objects.create(username='victim', email='victim@yamdb.fake')
+    rates = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    print(f'{requests} запросов с {addresses} адресов, лимиты {rates}')
+    for label, throttled in (
+        ('без ограничения', False), ('с ограничением', True)
+    ):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                scope: rate if throttled else None
+                for scope, rate in rates.items()
+            },
+        }
+        api_settings.reload()
+        User.objects.exclude(username='victim').delete()
+        buckets.clear()
+        results, elapsed = flood(Client(), requests, addresses)
+        print(f'{label}: {requests / elapsed:.0f} запросов/с')
+        for status, queries in sorted(results.items()):
+            print(
+                f'  {status}: {len(queries):6} ответов, '
+                f'запросов к базе {sum(queries):6} '
+                f'(максимум {max(queries)} на ответ)'
+            )
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
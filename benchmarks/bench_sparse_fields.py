@@ -0,0 +1,48 @@
+"""
+Выборочные поля (?fields=): размер ответа и время выборки и сериализации.
+python -m benchmarks.bench_sparse_fields [количество произведений]
+"""
+import json
+import sys
+
+from benchmarks.common import measure, report, seed_catalog, setup_django
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles)
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from reviews.models import Title
+
+    from api.mixins import get_eager_loading
+    from api.serializers import TitleReciveSerializer
+
+    factory = APIRequestFactory()
+    print(f'Произведений: {titles}, выгружаются все')
+    for query in ('', 'fields=id,name,rating', 'omit=description'):
+        request = Request(factory.get(f'/api/v1/titles/?{query}'))
+        context = {'request': request}
+
+        def serialize():
+            fields = TitleReciveSerializer(context=context).fields
+            select, prefetch, columns = get_eager_loading(Title, fields)
+            queryset = Title.objects.select_related(*select).prefetch_related(
+                *prefetch
+            ).only(*columns)
+            return TitleReciveSerializer(
+                queryset, many=True, context=context
+            ).data
+
+        with CaptureQueriesContext(connection) as queries:
+            payload = json.dumps(serialize(), ensure_ascii=False).encode()
+        print(f'"{query}": {len(payload) / 1024:.0f} KiB, '
+              f'запросов: {len(queries)}')
+        report(f'"{query}"', measure(serialize, repeat=10))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
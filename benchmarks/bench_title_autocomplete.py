@@ -0,0 +1,38 @@
+"""
+Подсказки по названиям: поиск префикса в индексе и полный запрос к API.
+python -m benchmarks.bench_title_autocomplete [количество произведений]
+"""
+import random
+import sys
+
+from benchmarks.common import measure, random_text, report, setup_django
+
+
+def main(titles):
+    setup_django()
+
+    from django.test import Client
+
+    from api.indexes import title_names
+
+    rnd = random.Random(1)
+    title_names.build(
+        (pk, random_text(rnd, rnd.randint(1, 4)).capitalize())
+        for pk in range(1, titles + 1)
+    )
+    client = Client()
+    print(f'Произведений в индексе: {titles}')
+    for prefix in ('ба', 'бабаба', 'rakora ю', 'ю'):
+        report(
+            f'index "{prefix}"',
+            measure(lambda: title_names.search(prefix, 10), repeat=1000),
+        )
+        url = f'/api/v1/titles/autocomplete/?q={prefix}'
+        report(
+            f'api "{prefix}"',
+            measure(lambda: client.get(url), repeat=1000),
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,62 @@
+"""
+Фасеты каталога: битовый индекс в памяти против запросов к базе.
+python -m benchmarks.bench_title_facets [количество произведений]
+"""
+import sys
+import time
+
+from benchmarks.common import measure, report, seed_catalog, setup_django
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles)
+
+    from django.db.models import Count
+    from django.test import Client
+    from reviews.models import Category, Genre, Title
+
+    from api.cache import get_catalog_cache
+    from api.indexes import title_facets
+
+    started = time.perf_counter()
+    title_facets.build(title_facets.load_rows())
+    print(f'Произведений: {titles}, построение индекса '
+          f'{(time.perf_counter() - started) * 1000:.0f} ms')
+
+    def group_by(queryset):
+        # Один GROUP BY на фасет по текущей выборке.
+        ids = queryset.values('id')
+        list(Title.genre.through.objects.filter(title_id__in=ids)
+             .values('genre__slug').annotate(total=Count('title_id')))
+        list(queryset.values('category__slug').annotate(total=Count('id')))
+        list(queryset.values('year').annotate(total=Count('id')))
+
+    def per_facet(client, selection):
+        # Как делал интерфейс: отдельный список с count на каждое значение.
+        # Кэш ответов сбрасываем, чтобы считать запросы к базе.
+        get_catalog_cache().clear()
+        for genre in Genre.objects.values_list('slug', flat=True):
+            client.get(f'/api/v1/titles/?{selection}&genre={genre}')
+        for category in Category.objects.values_list('slug', flat=True):
+            client.get(f'/api/v1/titles/?{selection}&category={category}')
+
+    client = Client()
+    for selection in ('', 'genre=genre-1', 'category=category-2&year=2000'):
+        queryset = Title.objects.all()
+        if selection:
+            filters = dict(part.split('=') for part in selection.split('&'))
+            for name, value in filters.items():
+                field = 'year' if name == 'year' else f'{name}__slug'
+                queryset = queryset.filter(**{field: value})
+        url = f'/api/v1/titles/facets/?{selection}'
+        report(f'index api "{selection}"', measure(lambda: client.get(url)))
+        report(f'group by "{selection}"', measure(lambda: group_by(queryset)))
+        report(
+            f'per facet "{selection}"',
+            measure(lambda: per_facet(client, selection), repeat=5),
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,44 @@
+"""
+Поиск по произведениям: FTS5 с ранжированием BM25 против icontains.
+python -m benchmarks.bench_title_search [количество произведений]
+"""
+import sys
+
+from benchmarks.common import measure, report, seed_catalog, setup_django
+
+
+def main(titles):
+    setup_django()
+    seed_catalog(titles=titles)
+
+    from django.db.models import Q
+    from reviews.models import Title
+
+    from api.search import has_fts, search_titles
+
+    assert has_fts('default'), 'SQLite собран без FTS5'
+    print(f'Произведений: {titles}')
+    # Частое слово, редкое слово, два слова, префикс.
+    for query in ('бабаба', 'rakora', 'бабаба бабаве', 'бабав'):
+        # Как в API: количество для пагинации и первая страница.
+        def fts():
+            queryset = search_titles(Title.objects.all(), query)
+            queryset.count()
+            list(queryset[:5])
+
+        def icontains():
+            queryset = Title.objects.all()
+            for token in query.split():
+                queryset = queryset.filter(
+                    Q(name__icontains=token)
+                    | Q(description__icontains=token)
+                )
+            queryset.count()
+            list(queryset.order_by('id')[:5])
+
+        report(f'fts5 "{query}"', measure(fts))
+        report(f'icontains "{query}"', measure(icontains))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,111 @@
+"""
+Общая подготовка бенчмарков: Django поднимается на отдельной
+временной базе SQLite, схема создаётся миграциями.
+Запуск из корня репозитория: python -m benchmarks.<имя_модуля>
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+SYLLABLES = (
+    'ба', 'ве', 'го', 'ду', 'жи', 'за', 'ки', 'ло', 'му', 'на',
+    'по', 'ре', 'си', 'то', 'фу', 'ха', 'ше', 'ю', 'ra', 'ko',
+)
+# Словарь из ~8000 псевдослов: термины встречаются с разной частотой,
+# как в настоящих названиях и описаниях.
+WORDS = tuple(
+    first + second + third
+    for first in SYLLABLES for second in SYLLABLES for third in SYLLABLES
+)
+
+
+def setup_django():
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    database = Path(tempfile.mkdtemp()) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = str(database)
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return database
+
+
+def random_text(rnd, words):
+    # Квадрат равномерного распределения даёт частые и редкие слова.
+    return ' '.join(
+        WORDS[int(rnd.random() ** 2 * len(WORDS))] for _ in range(words)
+    )
+
+
+def seed_catalog(titles=1000, reviews_per_title=0, seed=1):
+    """Наполняем каталог произведениями, жанрами, категориями и отзывами."""
+    from reviews.models import Category, Genre, Review, Title
+    from users.models import User
+
+    rnd = random.Random(seed)
+    categories = Category.objects.bulk_create(
+        Category(id=i, name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(1, 6)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(id=i, name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(1, 16)
+    )
+    Title.objects.bulk_create(
+        Title(
+            id=i,
+            name=random_text(rnd, rnd.randint(1, 4)).capitalize(),
+            year=rnd.randint(1900, 2020),
+            category=rnd.choice(categories),
+            description=random_text(rnd, 20),
+        )
+        for i in range(1, titles + 1)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre.id)
+        for title_id in range(1, titles + 1)
+        for genre in rnd.sample(genres, 2)
+    )
+    if reviews_per_title:
+        users = User.objects.bulk_create(
+            User(id=i, username=f'user{i}', email=f'user{i}@yamdb.fake')
+            for i in range(1, reviews_per_title + 1)
+        )
+        Review.objects.bulk_create(
+            Review(
+                title_id=title_id, author=user,
+                text=random_text(rnd, 30), score=rnd.randint(1, 10),
+            )
+            for title_id in range(1, titles + 1)
+            for user in users
+        )
+        from reviews.signals import rebuild_title_rating
+        rebuild_title_rating()
+
+
+def measure(func, repeat=50):
+    """Медиана и 99-й перцентиль времени вызова в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return (
+        timings[len(timings) // 2],
+        timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    )
+
+
+def report(name, timings):
+    median, p99 = timings
+    print(f'{name:<40} median {median:8.3f} ms   p99 {p99:8.3f} ms')
@@ -0,0 +1,20 @@
+import pytest
+from api.cache import categories, genres
+from api.indexes import title_facets, title_names
+from api.throttling import buckets
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Кэши и индексы в памяти живут дольше тестовой базы:
+    очищаем их перед каждым тестом.
+    """
+    for cache in caches.all():
+        cache.clear()
+    title_names.reset()
+    title_facets.reset()
+    categories.clear()
+    genres.clear()
+    buckets.clear()
@@ -0,0 +1,19 @@
+import pytest
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(user, admin):
+    """Произведение с категорией, жанром, отзывом и комментарием."""
+    category = Category.objects.create(name='Фильм', slug='films')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Война и мир', year=1869, category=category,
+        description='Роман в четырёх томах',
+    )
+    title.genre.set([drama])
+    review = Review.objects.create(
+        title=title, author=admin, text='Хорошо', score=7
+    )
+    Comment.objects.create(review=review, author=user, text='Согласен')
+    return title, review
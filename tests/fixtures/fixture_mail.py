@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def send_mail_on_commit(settings):
+    """
+    Тесты проверяют письма сразу после запроса, поэтому очередь
+    отправляется после фиксации транзакции, а не фоновым потоком.
+    """
+    settings.EMAIL_OUTBOX_DELIVERY = 'on_commit'
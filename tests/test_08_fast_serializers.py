@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+
+import pytest
+from api.fastpath import compile_plan
+from api.mixins import get_eager_loading
+from api.serializers import (CommentSerializer, ReviewsSerializer,
+                             TitleReciveSerializer)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def make_context(query=''):
+    request = APIRequestFactory().get(f'/api/v1/titles/?{query}')
+    return {'request': Request(request)}
+
+
+def render_both(serializer_class, queryset, query=''):
+    """JSON обычного сериализатора и JSON, собранный по плану values()."""
+    context = make_context(query)
+    serializer = serializer_class(context=context)
+    select, prefetch, _ = get_eager_loading(
+        queryset.model, serializer.fields
+    )
+    instances = queryset.select_related(*select).prefetch_related(*prefetch)
+    expected = serializer_class(instances, many=True, context=context).data
+    plan = compile_plan(serializer)
+    assert plan is not None, (
+        f'Для {serializer_class.__name__} с параметрами `{query}` '
+        'должен строиться план values().'
+    )
+    actual = plan.serialize(list(queryset.values(*plan.columns)))
+    renderer = JSONRenderer()
+    return renderer.render(expected), renderer.render(actual)
+
+
+@pytest.fixture
+def catalog(user, admin):
+    category = Category.objects.create(name='Фильм', slug='films')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    noir = Genre.objects.create(name='Нуар', slug='noir')
+    full = Title.objects.create(
+        name='Война и мир', year=1869, category=category,
+        description='Роман "в четырёх" томах\n',
+    )
+    full.genre.set([noir, drama, comedy])
+    bare = Title.objects.create(name='Без категории', year=None)
+    single = Title.objects.create(name='Один жанр', year=2000)
+    single.genre.set([comedy])
+    first = Review.objects.create(
+        title=full, author=user, text='Хорошо', score=7
+    )
+    Review.objects.create(title=full, author=admin, text='Плохо', score=2)
+    Review.objects.filter(pk=first.pk).update(
+        pub_date=datetime(2023, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    )
+    Comment.objects.create(review=first, author=admin, text='Согласен')
+    Comment.objects.create(review=first, author=user, text='Спасибо')
+    return full, bare, single
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08FastSerializers:
+
+    @pytest.mark.parametrize('query', [
+        '', 'fields=id,name,rating', 'omit=genre', 'fields=genre,category',
+    ])
+    def test_01_titles_parity(self, catalog, query):
+        expected, actual = render_both(
+            TitleReciveSerializer, Title.objects.order_by('id'), query
+        )
+        assert actual == expected, (
+            'Ответ, собранный из values(), должен побайтно совпадать '
+            f'с выводом TitleReciveSerializer (параметры `{query}`).'
+        )
+
+    @pytest.mark.parametrize('query', ['', 'fields=author,pub_date'])
+    def test_02_reviews_parity(self, catalog, query):
+        expected, actual = render_both(
+            ReviewsSerializer, Review.objects.order_by('id'), query
+        )
+        assert actual == expected, (
+            'Ответ, собранный из values(), должен побайтно совпадать '
+            f'с выводом ReviewsSerializer (параметры `{query}`).'
+        )
+
+    def test_03_comments_parity(self, catalog):
+        expected, actual = render_both(
+            CommentSerializer, Comment.objects.order_by('id')
+        )
+        assert actual == expected, (
+            'Ответ, собранный из values(), должен побайтно совпадать '
+            'с выводом CommentSerializer.'
+        )
+
+    def test_04_unsupported_fields_fall_back(self, catalog, client):
+        serializer = TitleReciveSerializer(
+            context=make_context('include=score_distribution')
+        )
+        assert compile_plan(serializer) is None, (
+            'Поле, которое нельзя собрать из колонок, должно '
+            'отключать сборку из values().'
+        )
+        response = client.get('/api/v1/titles/?include=score_distribution')
+        assert 'score_distribution' in response.json()['results'][0]
+
+    @pytest.mark.parametrize('url,order', [
+        ('/api/v1/titles/', (0, 1, 2)),
+        ('/api/v1/titles/?cursor=', (0, 1, 2)),
+        ('/api/v1/titles/?search=война', (0,)),
+        ('/api/v1/titles/?search=&cursor=', (0, 1, 2)),
+        ('/api/v1/titles/?genre=comedy', (0, 2)),
+    ])
+    def test_05_list_endpoint(self, catalog, client, url, order):
+        response = client.get(url)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [item['id'] for item in results] == [
+            catalog[index].id for index in order
+        ], f'Неверный порядок списка `{url}`.'
+        titles = Title.objects.in_bulk()
+        for item in results:
+            context = make_context()
+            expected = JSONRenderer().render(TitleReciveSerializer(
+                titles[item['id']], context=context
+            ).data)
+            assert JSONRenderer().render(item) == expected, (
+                f'Элементы списка `{url}` должны совпадать с выводом '
+                'TitleReciveSerializer.'
+            )
+
+    def test_06_review_cursor_endpoint(self, catalog, client):
+        full, _, _ = catalog
+        url = f'/api/v1/titles/{full.id}/reviews/?cursor='
+        response = client.get(url)
+        data = response.json()
+        expected = JSONRenderer().render(ReviewsSerializer(
+            Review.objects.order_by('pub_date', 'id'), many=True,
+            context=make_context(),
+        ).data)
+        assert JSONRenderer().render(data['results']) == expected
+
+    def test_07_search_with_cursor(self, catalog, client):
+        response = client.get('/api/v1/titles/?search=война&cursor=')
+        assert response.status_code == 400, (
+            'Курсор сортирует по id и не должен молча подменять '
+            'сортировку поиска по релевантности.'
+        )
+        assert 'cursor' in response.json()
@@ -0,0 +1,71 @@
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from api import renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+PAYLOAD = OrderedDict([
+    ('count', 2),
+    ('results', [
+        OrderedDict([
+            ('id', 1),
+            ('name', 'Война и мир\u2028«том 1»\u2029'),
+            ('rating', 7.333333333333333),
+            ('category', None),
+            ('genre', [{'name': 'Драма', 'slug': 'drama'}]),
+        ]),
+        {
+            'id': 2,
+            'rating': Decimal('5.50'),
+            'pub_date': datetime(
+                2023, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc
+            ),
+            'local_date': datetime(2023, 1, 2, 3, 4, 5),
+            'moscow_date': datetime(
+                2023, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=3))
+            ),
+            'day': date(2023, 1, 2),
+            'uuid': uuid.UUID(int=1),
+            'message': gettext_lazy('Ошибка'),
+            'scores': {1: 0, 10: 3},
+            'tuple': (1, 2),
+        },
+    ]),
+])
+
+
+class Test09JSONRenderer:
+
+    def test_01_same_bytes_as_json_renderer(self):
+        expected = JSONRenderer().render(PAYLOAD)
+        assert FastJSONRenderer().render(PAYLOAD) == expected, (
+            'FastJSONRenderer должен выводить те же байты, что и '
+            'JSONRenderer DRF.'
+        )
+
+    def test_02_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.dumps(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_03_indent_uses_json_renderer(self):
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(PAYLOAD, media_type) == (
+            JSONRenderer().render(PAYLOAD, media_type)
+        )
+
+    def test_04_parser(self):
+        body = '{"name": "Война", "genre": ["drama"], "year": 1869}'.encode()
+        assert FastJSONParser().parse(BytesIO(body)) == {
+            'name': 'Война', 'genre': ['drama'], 'year': 1869,
+        }
+        for invalid in (b'{"name": }', b'{"rating": NaN}'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(BytesIO(invalid))
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from api.parsers import CBORParser, MessagePackParser
+from api.renderers import CBORRenderer, MessagePackRenderer
+from rest_framework.exceptions import ParseError
+
+msgpack = pytest.importorskip('msgpack')
+cbor2 = pytest.importorskip('cbor2')
+
+FORMATS = {
+    'application/msgpack': lambda content: msgpack.unpackb(
+        content, raw=False
+    ),
+    'application/cbor': cbor2.loads,
+}
+ENCODERS = {
+    'application/msgpack': msgpack.packb,
+    'application/cbor': cbor2.dumps,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10BinaryFormats:
+
+    @pytest.mark.parametrize('media_type', FORMATS)
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/{title}/',
+        '/api/v1/titles/{title}/stats/',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        '/api/v1/categories/',
+        '/api/v1/genres/?search=драма',
+    ])
+    def test_01_same_data_as_json(self, catalog, client, url, media_type):
+        title, review = catalog
+        url = url.format(title=title.id, review=review.id)
+        expected = client.get(url, HTTP_ACCEPT='application/json').json()
+        response = client.get(url, HTTP_ACCEPT=media_type)
+        assert response.status_code == 200
+        assert response['Content-Type'] == media_type, (
+            f'На Accept: {media_type} `{url}` должен отвечать '
+            'в этом формате.'
+        )
+        assert FORMATS[media_type](response.content) == expected, (
+            f'Ответ `{url}` в {media_type} должен содержать те же данные, '
+            'что и JSON.'
+        )
+
+    @pytest.mark.parametrize('media_type', FORMATS)
+    def test_02_request_body(self, catalog, user_client, media_type):
+        title, _ = catalog
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        body = ENCODERS[media_type]({'text': 'Неплохо', 'score': 6})
+        response = user_client.post(
+            url, body, content_type=media_type, HTTP_ACCEPT=media_type
+        )
+        assert response.status_code == 201, (
+            f'Отзыв должен создаваться из тела в {media_type}.'
+        )
+        data = FORMATS[media_type](response.content)
+        assert data == user_client.get(
+            f'{url}{data["id"]}/', HTTP_ACCEPT='application/json'
+        ).json()
+
+        response = user_client.post(
+            url, body, content_type=media_type, HTTP_ACCEPT=media_type
+        )
+        assert response.status_code == 400
+        assert FORMATS[media_type](response.content) == {
+            'non_field_errors': ['Нельзя дважды писать отзыв!'],
+        }
+
+    @pytest.mark.parametrize('renderer_class, decode', [
+        (MessagePackRenderer, FORMATS['application/msgpack']),
+        (CBORRenderer, FORMATS['application/cbor']),
+    ])
+    def test_03_values_as_in_json(self, renderer_class, decode):
+        data = {
+            'pub_date': datetime(
+                2023, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc
+            ),
+            'rating': Decimal('5.50'),
+        }
+        assert decode(renderer_class().render(data)) == {
+            'pub_date': '2023-01-02T03:04:05.678901Z',
+            'rating': 5.5,
+        }
+
+    @pytest.mark.parametrize('parser_class, invalid', [
+        (MessagePackParser, 'c1'),
+        (MessagePackParser, '82a161'),
+        (CBORParser, 'ff'),
+        (CBORParser, 'a26161'),
+    ])
+    def test_04_parse_error(self, parser_class, invalid):
+        with pytest.raises(ParseError):
+            parser_class().parse(BytesIO(bytes.fromhex(invalid)))
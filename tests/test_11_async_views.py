@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from api.views import (CategoryViewSet, CommentsViewSet, GenreViewSet,
+                       ReviewsViewSet, TitleViewSet)
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from reviews.models import Review, Title
+
+VIEWS = {
+    'titles': (TitleViewSet, {'get': 'list'}),
+    'title': (TitleViewSet, {'get': 'retrieve'}),
+    'stats': (TitleViewSet, {'get': 'stats'}),
+    'facets': (TitleViewSet, {'get': 'facets'}),
+    'autocomplete': (TitleViewSet, {'get': 'autocomplete'}),
+    'bulk': (TitleViewSet, {'get': 'bulk'}),
+    'categories': (CategoryViewSet, {'get': 'list'}),
+    'genres': (GenreViewSet, {'get': 'list'}),
+    'reviews': (ReviewsViewSet, {'get': 'list'}),
+    'review': (ReviewsViewSet, {'get': 'retrieve'}),
+    'comments': (CommentsViewSet, {'get': 'list'}),
+}
+
+
+@pytest.fixture
+def catalog(catalog):
+    """Общий каталог и ещё одно произведение без категории и жанров."""
+    Title.objects.create(name='Анна Каренина', year=1878)
+    return catalog
+
+
+def get_views(viewset, actions):
+    sync_view = viewset.as_view(actions)
+    with override_settings(ASYNC_READ_VIEWS=True):
+        async_view = viewset.as_view(actions)
+    return sync_view, async_view
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11AsyncViews:
+
+    @pytest.mark.parametrize('name, query, kwargs', [
+        ('titles', '?genre=drama', {}),
+        ('titles', '?cursor=', {}),
+        ('title', '', {'pk': '{title}'}),
+        ('title', '', {'pk': '0'}),
+        ('stats', '', {'pk': '{title}'}),
+        ('facets', '?year=1869', {}),
+        ('autocomplete', '?q=вой', {}),
+        ('bulk', '?ids={title},0', {}),
+        ('categories', '', {}),
+        ('genres', '?search=др', {}),
+        ('reviews', '?fields=text,score', {'title_id': '{title}'}),
+        ('review', '', {'title_id': '{title}', 'pk': '{review}'}),
+        ('comments', '', {'title_id': '{title}', 'review_id': '{review}'}),
+    ])
+    def test_01_same_response(self, catalog, name, query, kwargs):
+        title, review = catalog
+        ids = {'title': title.id, 'review': review.id}
+        query = query.format(**ids)
+        kwargs = {key: value.format(**ids) for key, value in kwargs.items()}
+        sync_view, async_view = get_views(*VIEWS[name])
+        assert not asyncio.iscoroutinefunction(sync_view)
+        assert asyncio.iscoroutinefunction(async_view), (
+            'При ASYNC_READ_VIEWS вьюсет должен отдавать асинхронную view.'
+        )
+
+        # Асинхронная view первой: её ответ собирается без кэша.
+        response = async_to_sync(async_view)(
+            APIRequestFactory().get(f'/{query}'), **kwargs
+        )
+        expected = sync_view(APIRequestFactory().get(f'/{query}'), **kwargs)
+        expected.render()
+        assert response.status_code == expected.status_code
+        assert response['Content-Type'] == expected['Content-Type']
+        assert response.get('ETag') == expected.get('ETag')
+        assert response.content == expected.content, (
+            f'Асинхронная view `{name}{query}` должна отвечать так же, '
+            'как синхронная.'
+        )
+
+    def test_02_write_requests(self, catalog, user):
+        title, _ = catalog
+        _, async_view = get_views(ReviewsViewSet, {'post': 'create'})
+        request = APIRequestFactory().post(
+            '/', {'text': 'Неплохо', 'score': 6}, format='json'
+        )
+        force_authenticate(request, user)
+        response = async_to_sync(async_view)(request, title_id=title.id)
+        assert response.status_code == 201
+        assert Review.objects.filter(title=title, author=user).exists()
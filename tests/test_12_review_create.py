@@ -0,0 +1,64 @@
+import pytest
+from reviews.models import Review, Title, TitleScore
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Война и мир', year=1869)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ReviewCreate:
+
+    def test_01_query_budget(self, title, user_client, moderator_client,
+                             django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        # Пользователь, BEGIN, отзыв, рейтинг, счётчик оценки и вставка
+        # первого счётчика этой оценки в точке сохранения.
+        with django_assert_num_queries(8):
+            response = user_client.post(
+                url, {'text': 'Хорошо', 'score': 7}, format='json'
+            )
+        assert response.status_code == 201
+        # Счётчик оценки уже есть: только UPDATE.
+        with django_assert_num_queries(5):
+            response = moderator_client.post(
+                url, {'text': 'Тоже хорошо', 'score': 7}, format='json'
+            )
+        assert response.status_code == 201
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            14, 2, 7.0
+        )
+        assert TitleScore.objects.get(title=title, score=7).count == 2
+
+    def test_02_duplicate_review(self, title, user_client,
+                                 django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, {'text': 'Хорошо', 'score': 7}, format='json')
+        # Пользователь, BEGIN и отклонённая вставка.
+        with django_assert_num_queries(3):
+            response = user_client.post(
+                url, {'text': 'Ещё раз', 'score': 1}, format='json'
+            )
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Нельзя дважды писать отзыв!'],
+        }
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Отклонённый отзыв не должен менять рейтинг произведения.'
+        )
+
+    def test_03_missing_title(self, title, user_client,
+                              django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id + 1}/reviews/'
+        # Пользователь, BEGIN, вставка и обновление рейтинга без строки.
+        with django_assert_num_queries(4):
+            response = user_client.post(
+                url, {'text': 'Хорошо', 'score': 7}, format='json'
+            )
+        assert response.status_code == 404
+        assert not Review.objects.exists(), (
+            'Отзыв на несуществующее произведение должен откатываться.'
+        )
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def review(user, admin):
+    title = Title.objects.create(name='Война и мир', year=1869)
+    return Review.objects.create(
+        title=title, author=admin, text='Хорошо', score=7
+    )
+
+
+def get_counters(review):
+    review.refresh_from_db()
+    return review.comment_count, review.last_comment_at
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CommentCounts:
+
+    def test_01_api(self, review, user_client, admin_client):
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        )
+        first = user_client.post(url, {'text': 'Согласен'}, format='json')
+        second = admin_client.post(url, {'text': 'Спасибо'}, format='json')
+        data = user_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/'
+        ).json()['results'][0]
+        assert data['comment_count'] == 2, (
+            'Отзыв должен содержать количество комментариев '
+            'в поле `comment_count`.'
+        )
+        assert data['last_comment_at'] == second.json()['pub_date'], (
+            'Поле `last_comment_at` должно содержать дату '
+            'последнего комментария.'
+        )
+
+        admin_client.delete(f'{url}{second.json()["id"]}/')
+        data = user_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        ).json()
+        assert data['comment_count'] == 1
+        assert data['last_comment_at'] == first.json()['pub_date']
+
+    def test_02_cascade(self, review, user, admin):
+        Comment.objects.create(review=review, author=user, text='Первый')
+        Comment.objects.create(review=review, author=admin, text='Второй')
+        last = Comment.objects.create(
+            review=review, author=user, text='Третий'
+        )
+        user.delete()
+        assert get_counters(review) == (1, Comment.objects.get().pub_date), (
+            'Комментарии, удалённые вместе с автором, должны убираться '
+            'из счётчика отзыва.'
+        )
+        assert not Comment.objects.filter(pk=last.pk).exists()
+
+    def test_03_review_update_keeps_counters(self, review, user):
+        stale = Review.objects.get(pk=review.pk)
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        stale.text = 'Очень хорошо'
+        stale.save()
+        count, last_comment_at = get_counters(review)
+        assert (review.text, count) == ('Очень хорошо', 1), (
+            'Сохранение отзыва не должно перезаписывать счётчик '
+            'комментариев загруженным ранее значением.'
+        )
+        assert last_comment_at is not None
+
+    def test_04_rebuild_command(self, review, user):
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        last_comment_at = datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        Comment.objects.update(pub_date=last_comment_at)
+        Review.objects.update(comment_count=10, last_comment_at=None)
+        call_command('rebuild_comment_counts')
+        assert get_counters(review) == (1, last_comment_at)
@@ -0,0 +1,94 @@
+import re
+
+import pytest
+from django.db import connection
+
+# (адрес, таблица основного запроса, допустим ли полный просмотр).
+# Полный просмотр допустим только там, где ответ — вся таблица
+# постранично или справочник целиком.
+ENDPOINTS = [
+    ('/api/v1/titles/', 'reviews_title', True),
+    ('/api/v1/titles/?cursor=', 'reviews_title', True),
+    ('/api/v1/titles/?genre=drama', 'reviews_title', False),
+    ('/api/v1/titles/?category=films', 'reviews_title', False),
+    ('/api/v1/titles/?year=1869', 'reviews_title', False),
+    ('/api/v1/titles/{title}/', 'reviews_title', False),
+    ('/api/v1/titles/{title}/stats/', 'reviews_title', False),
+    ('/api/v1/titles/bulk/?ids={title}', 'reviews_title', False),
+    ('/api/v1/titles/{title}/reviews/', 'reviews_review', False),
+    ('/api/v1/titles/{title}/reviews/?cursor=', 'reviews_review', False),
+    ('/api/v1/titles/{title}/reviews/{review}/', 'reviews_review', False),
+    (
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        'reviews_comment', False,
+    ),
+    (
+        '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=',
+        'reviews_comment', False,
+    ),
+    (
+        '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+        'reviews_comment', False,
+    ),
+    ('/api/v1/categories/', 'reviews_category', True),
+    ('/api/v1/genres/', 'reviews_genre', True),
+    ('/api/v1/users/', 'users_user', True),
+    ('/api/v1/users/{username}/', 'users_user', False),
+]
+FROM_TABLE = re.compile(r'\bFROM "(\w+)"')
+
+
+def capture_queries(client, url):
+    """Все SELECT, выполненные при запросе, с параметрами."""
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        if sql.startswith('SELECT'):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return queries
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test14QueryPlans:
+
+    @pytest.mark.parametrize('url, table, full_scan', ENDPOINTS)
+    def test_01_main_query_plan(self, catalog, user, admin_client, url,
+                                table, full_scan):
+        title, review = catalog
+        url = url.format(
+            title=title.id, review=review.id,
+            comment=review.comments.get().id, username=user.username,
+        )
+        main_queries = [
+            (sql, params) for sql, params in capture_queries(admin_client, url)
+            if FROM_TABLE.search(sql).group(1) == table
+        ]
+        assert main_queries, f'Запрос к `{url}` не читает `{table}`.'
+        for sql, params in main_queries:
+            plan = explain(sql, params)
+            assert not any('TEMP B-TREE' in step for step in plan), (
+                f'Основной запрос `{url}` сортируется во временном '
+                f'B-дереве, а не по индексу: {plan}\n{sql}'
+            )
+            if full_scan:
+                continue
+            assert not any(
+                step.startswith(f'SCAN {table}') for step in plan
+            ), (
+                f'Основной запрос `{url}` просматривает `{table}` '
+                f'целиком: {plan}\n{sql}'
+            )
@@ -0,0 +1,175 @@
+import time
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.utils import timezone
+from users.models import OutboxEmail
+from users import outbox
+from users.outbox import deliver_outbox, enqueue_mail
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, который считает открытые соединения."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise SMTPServerDisconnected('Соединение закрыто')
+
+
+def enqueue(count):
+    return [
+        enqueue_mail('Код подтверждения', f'Код {i}', f'user{i}@yamdb.fake')
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_on_commit(self, client):
+        response = client.post(self.url_signup, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username',
+        })
+        assert response.status_code == 200
+        assert [message.to for message in mail.outbox] == [
+            ['valid@yamdb.fake']
+        ]
+        assert not OutboxEmail.objects.exists(), (
+            'Отправленное письмо должно удаляться из очереди.'
+        )
+
+    @override_settings(EMAIL_OUTBOX_DELIVERY='worker')
+    def test_02_rolled_back_signup_sends_nothing(self):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                enqueue(1)
+                raise RuntimeError
+        assert not OutboxEmail.objects.exists()
+
+    @override_settings(
+        EMAIL_OUTBOX_DELIVERY='worker',
+        EMAIL_BACKEND='tests.test_15_email_outbox.CountingBackend',
+    )
+    def test_03_worker_batches(self, client):
+        client.post(self.url_signup, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username',
+        })
+        enqueue(4)
+        assert not mail.outbox, (
+            'При EMAIL_OUTBOX_DELIVERY=worker письма отправляет '
+            'только обработчик очереди.'
+        )
+        CountingBackend.opened = 0
+        call_command('send_outbox', '--once', '--batch-size=3')
+        assert len(mail.outbox) == 5
+        assert mail.outbox[0].to == ['valid@yamdb.fake']
+        assert CountingBackend.opened == 2, (
+            'Каждая пачка писем должна отправляться через одно соединение.'
+        )
+        assert not OutboxEmail.objects.exists()
+
+    @override_settings(
+        EMAIL_OUTBOX_DELIVERY='worker',
+        EMAIL_OUTBOX_RETRY_DELAY=30,
+        EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    )
+    def test_04_retry_with_backoff(self):
+        email, = enqueue(1)
+        delays = []
+        with override_settings(
+            EMAIL_BACKEND='tests.test_15_email_outbox.FailingBackend'
+        ):
+            for _ in range(3):
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+                started = timezone.now()
+                assert deliver_outbox() == (0, 1)
+                email.refresh_from_db()
+                if email.next_attempt_at is not None:
+                    delays.append(email.next_attempt_at - started)
+        assert [round(delay.total_seconds()) for delay in delays] == [30, 60]
+        assert email.attempts == 3
+        assert email.next_attempt_at is None, (
+            'После EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо больше '
+            'не должно отправляться.'
+        )
+        assert 'SMTPServerDisconnected' in email.last_error
+        assert deliver_outbox() == (0, 0)
+
+        OutboxEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert deliver_outbox() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    @override_settings(EMAIL_OUTBOX_DELIVERY='worker')
+    def test_05_claimed_batch_is_skipped(self):
+        enqueue(2)
+        OutboxEmail.objects.filter(pk=OutboxEmail.objects.first().pk).update(
+            claim='other',
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+        )
+        assert deliver_outbox() == (1, 0), (
+            'Письма, которые забрал другой обработчик, '
+            'не должны отправляться повторно.'
+        )
+
+    def test_06_file_backend(self, tmp_path):
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+            EMAIL_FILE_PATH=str(tmp_path),
+            EMAIL_OUTBOX_DELIVERY='worker',
+        ):
+            enqueue(3)
+            assert deliver_outbox() == (3, 0)
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, (
+            'Пачка писем должна записываться через одно соединение.'
+        )
+        assert files[0].read_text().count('Subject:') == 3
+
+    @override_settings(EMAIL_OUTBOX_DELIVERY='thread')
+    def test_07_background_thread(self):
+        enqueue(2)
+        deadline = time.monotonic() + 5
+        while len(mail.outbox) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(mail.outbox) == 2, (
+            'При EMAIL_OUTBOX_DELIVERY=thread письма должен отправить '
+            'фоновый поток после фиксации транзакции.'
+        )
+
+    @override_settings(
+        EMAIL_OUTBOX_DELIVERY='thread', EMAIL_OUTBOX_POLL_INTERVAL=0.05
+    )
+    def test_08_background_thread_survives_errors(self, monkeypatch):
+        calls = []
+
+        def failing_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise DatabaseError('База недоступна')
+            return deliver_outbox(*args, **kwargs)
+
+        monkeypatch.setattr(outbox, 'deliver_outbox', failing_once)
+        enqueue(1)
+        deadline = time.monotonic() + 5
+        while not mail.outbox and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(mail.outbox) == 1, (
+            'Ошибка при отправке не должна останавливать фоновый поток.'
+        )
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from auth.confirmation_code import make_confirmation_code
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from users.models import OutboxEmail, User
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+
+def mailed_code():
+    """Код из последнего письма в очереди."""
+    return OutboxEmail.objects.last().body.split()[-1]
+
+
+def get_token(client, code, username=SIGNUP_DATA['username']):
+    return client.post(URL_TOKEN, data={
+        'username': username, 'confirmation_code': code,
+    })
+
+
+@pytest.fixture(autouse=True)
+def worker_delivery(settings):
+    # Письма остаются в очереди, и код можно прочитать из неё.
+    settings.EMAIL_OUTBOX_DELIVERY = 'worker'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConfirmationCodes:
+
+    def test_01_signup_and_token_queries(self, client):
+        with CaptureQueriesContext(connection) as signup:
+            response = client.post(URL_SIGNUP, data=SIGNUP_DATA)
+        assert response.status_code == 200
+        code = mailed_code()
+        with CaptureQueriesContext(connection) as token:
+            response = get_token(client, code)
+        assert response.status_code == 201
+        assert 'access' in response.json()['token']
+        user_queries = [
+            query['sql'] for query in signup.captured_queries
+            + token.captured_queries
+            if 'users_user' in query['sql']
+        ]
+        assert len(user_queries) == 2, (
+            'Регистрация и получение токена должны обходиться одной '
+            f'вставкой и одним чтением пользователя: {user_queries}'
+        )
+        assert User.objects.get().confirmation_code == 'XXXX', (
+            'Подписанный код не должен сохраняться в базе.'
+        )
+
+    def test_02_repeat_signup(self, client, user):
+        data = {'username': user.username, 'email': user.email}
+        assert client.post(URL_SIGNUP, data=data).status_code == 200
+        response = get_token(client, mailed_code(), user.username)
+        assert response.status_code == 201
+
+        response = client.post(URL_SIGNUP, data={
+            'username': user.username, 'email': 'other@yamdb.fake',
+        })
+        assert response.status_code == 400
+        response = client.post(URL_SIGNUP, data={
+            'username': 'other_username', 'email': user.email,
+        })
+        assert response.status_code == 400
+        assert OutboxEmail.objects.count() == 1
+
+    @override_settings(CONFIRMATION_CODE_LIFETIME=60)
+    def test_03_expired_code(self, client, user):
+        now = int(time.time())
+        expired = make_confirmation_code(user, now - 61)
+        fresh = make_confirmation_code(user, now - 59)
+        future = make_confirmation_code(user, now + 60)
+        assert get_token(client, expired, user.username).status_code == 400, (
+            'Код старше CONFIRMATION_CODE_LIFETIME не должен подходить.'
+        )
+        assert get_token(client, future, user.username).status_code == 400
+        assert get_token(client, fresh, user.username).status_code == 201
+
+    @pytest.mark.parametrize('code', ['', '12345', 'zzzz-', '-abc', 'a-b-c'])
+    def test_04_malformed_code(self, client, user, code):
+        assert get_token(client, code, user.username).status_code == 400
+
+    def test_05_code_bound_to_user(self, client, user, admin):
+        code = make_confirmation_code(user)
+        assert get_token(client, code, admin.username).status_code == 400
+        timestamp, sign = code.split('-')
+        tampered = f'{timestamp}-{sign[::-1]}'
+        assert get_token(client, tampered, user.username).status_code == 400
+
+        user.email = 'changed@yamdb.fake'
+        user.save()
+        assert get_token(client, code, user.username).status_code == 400, (
+            'После смены email выданный ранее код не должен подходить.'
+        )
+
+    @override_settings(CONFIRMATION_CODE_MODE='stored')
+    def test_06_stored_mode(self, client):
+        client.post(URL_SIGNUP, data=SIGNUP_DATA)
+        code = mailed_code()
+        assert User.objects.get().confirmation_code == code
+        assert get_token(client, code).status_code == 201
+        signed = make_confirmation_code(User.objects.get())
+        assert get_token(client, signed).status_code == 400
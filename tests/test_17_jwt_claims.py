@@ -0,0 +1,196 @@
+import time
+
+import pytest
+from auth.authentication import claims_status_key, revoke_token_claims
+from auth.get_token import get_tokens_for_user
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Review, Title
+from users.models import User
+
+URL_CATEGORIES = '/api/v1/categories/'
+
+
+@pytest.fixture(autouse=True)
+def claims_auth(settings):
+    settings.JWT_CLAIMS_AUTH = True
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_tokens_for_user(user)["access"]}'
+    )
+    return client
+
+
+def user_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data, format='json')
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+def create_category(client, slug):
+    return user_queries(
+        client, 'post', URL_CATEGORIES, {'name': slug, 'slug': slug}
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17JWTClaims:
+
+    def test_01_no_user_lookup(self, admin, user):
+        client = claims_client(admin)
+        response, queries = create_category(client, 'films')
+        assert response.status_code == 201
+        assert len(queries) == 1 and '"bio"' not in queries[0], (
+            'Первый запрос должен читать только время отзыва утверждений '
+            f'и активность пользователя: {queries}'
+        )
+        response, queries = create_category(client, 'music')
+        assert response.status_code == 201
+        assert not queries, (
+            'Права администратора должны проверяться по утверждениям '
+            f'токена без чтения пользователя: {queries}'
+        )
+        client = claims_client(user)
+        create_category(client, 'books')
+        response, queries = create_category(client, 'books')
+        assert response.status_code == 403
+        assert not queries
+
+    def test_02_token_without_claims(self, admin_client):
+        response, queries = create_category(admin_client, 'films')
+        assert response.status_code == 201
+        assert len(queries) == 1, (
+            'Токен без утверждений о роли должен проверяться по базе.'
+        )
+
+    def test_03_role_change_revokes_claims(self, admin, user, admin_client):
+        client = claims_client(user)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'},
+            format='json',
+        )
+        response, queries = create_category(client, 'films')
+        assert response.status_code == 201, (
+            'После повышения роли выданный ранее токен должен получить '
+            'новые права.'
+        )
+        assert len(queries) == 2, (
+            'Токен с отозванными утверждениями проверяется по базе.'
+        )
+
+        promoted = claims_client(admin)
+        admin_client.patch(
+            f'/api/v1/users/{admin.username}/', {'role': 'user'},
+            format='json',
+        )
+        response, queries = create_category(promoted, 'books')
+        assert response.status_code == 403, (
+            'После понижения роли выданный ранее токен не должен '
+            'сохранять права администратора.'
+        )
+        assert len(queries) == 2
+
+    def test_04_deleted_and_inactive_users(self, admin, user):
+        admin_token = claims_client(admin)
+        user_token = claims_client(user)
+        admin.is_active = False
+        admin.save()
+        response, _ = create_category(admin_token, 'films')
+        assert response.status_code == 401
+        user.delete()
+        response = user_token.get('/api/v1/users/me/')
+        assert response.status_code == 401
+
+    def test_05_profile_edit_keeps_claims(self, admin):
+        client = claims_client(admin)
+        response = client.patch(
+            '/api/v1/users/me/', {'bio': 'Новая биография'}, format='json'
+        )
+        assert response.status_code == 200
+        response, queries = create_category(client, 'films')
+        assert response.status_code == 201
+        assert not queries, (
+            'Изменение полей, которых нет в токене, не должно отзывать '
+            'его утверждения.'
+        )
+
+    def test_06_lazy_user(self, user):
+        client = claims_client(user)
+        client.get(URL_CATEGORIES)
+        title = Title.objects.create(name='Война и мир', year=1869)
+        response, queries = user_queries(
+            client, 'post', f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Хорошо', 'score': 7},
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert Review.objects.get().author == user
+        assert len(queries) == 1, (
+            'Пользователь должен загружаться один раз, когда он нужен.'
+        )
+
+        response = client.patch(
+            '/api/v1/users/me/', {'username': 'renamed'}, format='json'
+        )
+        assert response.status_code == 200
+        assert response.json()['username'] == 'renamed'
+
+    def test_07_disabled(self, admin, settings):
+        settings.JWT_CLAIMS_AUTH = False
+        response, queries = create_category(claims_client(admin), 'films')
+        assert response.status_code == 201
+        assert len(queries) == 1
+
+    def test_08_revocation_survives_cache_loss(self, admin, admin_client):
+        promoted = claims_client(admin)
+        create_category(promoted, 'films')
+        admin_client.patch(
+            f'/api/v1/users/{admin.username}/', {'role': 'user'},
+            format='json',
+        )
+        for number in range(400):
+            cache.set(f'unrelated:{number}', number)
+        response, _ = create_category(promoted, 'books')
+        assert response.status_code == 403, (
+            'Отзыв утверждений не должен теряться при вытеснении из кэша.'
+        )
+        cache.clear()
+        response, _ = create_category(promoted, 'books')
+        assert response.status_code == 403, (
+            'Отзыв утверждений должен переживать перезапуск процесса.'
+        )
+
+    def test_09_other_process(self, admin, settings):
+        settings.JWT_CLAIMS_CACHE_TIMEOUT = 1
+        client = claims_client(admin)
+        create_category(client, 'films')
+        # Другой процесс понизил роль: в кэше этого процесса метки нет.
+        User.objects.filter(pk=admin.pk).update(role='user')
+        revoke_token_claims(admin.pk)
+        cache.set(claims_status_key(admin.pk), (0, True), 1)
+        time.sleep(1.1)
+        response, _ = create_category(client, 'books')
+        assert response.status_code == 403, (
+            'Отзыв из другого процесса должен учитываться не позже '
+            'JWT_CLAIMS_CACHE_TIMEOUT секунд.'
+        )
+
+    def test_10_deleted_user_after_cache_loss(self, admin):
+        client = claims_client(admin)
+        create_category(client, 'films')
+        User.objects.filter(pk=admin.pk).delete()
+        cache.clear()
+        response, _ = create_category(client, 'books')
+        assert response.status_code == 401, (
+            'Токен удалённого пользователя должен отклоняться.'
+        )
+        assert not Category.objects.filter(slug='books').exists()
+
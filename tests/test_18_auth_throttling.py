@@ -0,0 +1,137 @@
+import pytest
+from api.throttling import TokenBuckets, TokenBucketThrottle, buckets
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(TokenBucketThrottle, 'timer', clock)
+    return clock
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates,
+        }
+    return set_rates
+
+
+def signup(client, number, ip='10.0.0.1', **data):
+    return client.post(URL_SIGNUP, data={
+        'username': f'user{number}', 'email': f'user{number}@yamdb.fake',
+        **data,
+    }, REMOTE_ADDR=ip)
+
+
+def forwarded_signup(client, number, forwarded_for):
+    """Регистрация с одного REMOTE_ADDR и заданным X-Forwarded-For."""
+    return client.post(URL_SIGNUP, data={
+        'username': f'user{number}', 'email': f'user{number}@yamdb.fake',
+    }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=forwarded_for).status_code
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18AuthThrottling:
+
+    def test_01_identity_bucket(self, client, clock):
+        for _ in range(10):
+            assert signup(client, 1).status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            response = signup(client, 1)
+        assert response.status_code == 429
+        assert int(response['Retry-After']) == 6
+        assert not queries.captured_queries, (
+            'Запрос сверх лимита должен отклоняться до обращения к базе.'
+        )
+        assert signup(client, 1, email='other@yamdb.fake').status_code == 429
+        assert signup(client, 2).status_code == 200
+
+        clock.now += 6
+        assert signup(client, 1).status_code == 200, (
+            'Корзина должна пополняться со временем.'
+        )
+        assert signup(client, 1).status_code == 429
+
+    def test_02_ip_bucket(self, client, clock, rates):
+        rates(auth_ip='3/min', auth_identity='10/min')
+        for number in range(3):
+            assert signup(client, number).status_code == 200
+        assert signup(client, 3).status_code == 429
+        assert signup(client, 3, ip='10.0.0.2').status_code == 200
+        clock.now += 20
+        assert signup(client, 4).status_code == 200
+
+    def test_03_token_brute_force(self, client, user, clock):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(10):
+            assert client.post(URL_TOKEN, data=data).status_code == 400
+        assert client.post(URL_TOKEN, data=data).status_code == 429, (
+            'Подбор кода подтверждения должен ограничиваться по username.'
+        )
+
+    def test_04_shared_cache(self, client, clock, settings):
+        settings.AUTH_THROTTLE_CACHE_ALIAS = 'default'
+        for _ in range(10):
+            assert signup(client, 1).status_code == 200
+        assert signup(client, 1).status_code == 429
+        assert not buckets._buckets
+        clock.now += 6
+        assert signup(client, 1).status_code == 200
+
+    def test_05_non_object_body(self, client, clock):
+        response = client.post(
+            URL_SIGNUP, data='["user"]', content_type='application/json',
+        )
+        assert response.status_code == 400
+
+    def test_06_prune(self, settings):
+        settings.AUTH_THROTTLE_MAX_BUCKETS = 2
+        store = TokenBuckets()
+        store.consume('a', 2, 1, now=0)
+        store.consume('b', 2, 1, now=0)
+        store.consume('c', 2, 1, now=0.5)
+        assert set(store._buckets) == {'a', 'b', 'c'}
+        store.consume('d', 2, 1, now=2)
+        assert set(store._buckets) == {'d'}, (
+            'Снова наполнившиеся корзины должны удаляться.'
+        )
+
+    def test_07_spoofed_forwarded_for(self, client, clock, rates):
+        rates(auth_ip='3/min', auth_identity='10/min')
+        statuses = [
+            forwarded_signup(client, number, f'192.168.0.{number}')
+            for number in range(5)
+        ]
+        assert statuses == [200, 200, 200, 429, 429], (
+            'Подменённый клиентом X-Forwarded-For не должен давать '
+            'новую корзину адреса.'
+        )
+
+    def test_08_trusted_proxy(self, client, clock, rates, settings):
+        rates(auth_ip='3/min', auth_identity='10/min')
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        statuses = [
+            forwarded_signup(client, number, f'10.1.1.{number}, 203.0.113.7')
+            for number in range(4)
+        ]
+        assert statuses == [200, 200, 200, 429], (
+            'За прокси адрес клиента берётся из записи, добавленной '
+            'доверенным прокси, а не из подставленных клиентом.'
+        )
+        assert forwarded_signup(client, 4, '203.0.113.8') == 200
@@ -0,0 +1,80 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import OutboxEmail
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+
+@pytest.fixture(autouse=True)
+def worker_delivery(settings):
+    settings.EMAIL_OUTBOX_DELIVERY = 'worker'
+
+
+def signup(client, data=SIGNUP_DATA):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(URL_SIGNUP, data=data)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SignupResend:
+
+    def test_01_repeat_within_cooldown(self, client):
+        response, _ = signup(client)
+        assert response.status_code == 200
+        for _ in range(3):
+            response, queries = signup(client)
+            assert response.status_code == 200
+            assert response.json() == SIGNUP_DATA
+            assert not queries, (
+                'Повторная регистрация во время паузы не должна '
+                f'обращаться к базе: {queries}'
+            )
+        assert OutboxEmail.objects.count() == 1, (
+            'Во время паузы повторное письмо с кодом не отправляется.'
+        )
+
+    def test_02_after_cooldown(self, client, user):
+        data = {'username': user.username, 'email': user.email}
+        signup(client, data)
+        signup(client, data)
+        assert OutboxEmail.objects.count() == 1
+        cache.clear()
+        response, _ = signup(client, data)
+        assert response.status_code == 200
+        assert OutboxEmail.objects.count() == 2, (
+            'После паузы код должен отправляться снова.'
+        )
+
+    def test_03_cooldown_per_user(self, client, user):
+        signup(client)
+        signup(client, {'username': user.username, 'email': user.email})
+        assert OutboxEmail.objects.count() == 2
+
+    def test_04_rejected_signup(self, client, user):
+        response, _ = signup(
+            client, {'username': user.username, 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == 400
+        signup(client, {'username': user.username, 'email': user.email})
+        assert OutboxEmail.objects.count() == 1, (
+            'Отклонённая регистрация не должна начинать паузу.'
+        )
+
+    def test_05_disabled(self, client, settings):
+        settings.SIGNUP_RESEND_COOLDOWN = 0
+        for _ in range(3):
+            signup(client)
+        assert OutboxEmail.objects.count() == 3
+
+    def test_06_stored_code_kept(self, client, settings, django_user_model):
+        settings.CONFIRMATION_CODE_MODE = 'stored'
+        signup(client)
+        code = django_user_model.objects.get().confirmation_code
+        signup(client)
+        assert django_user_model.objects.get().confirmation_code == code, (
+            'Во время паузы сохранённый код не должен меняться.'
+        )
@@ -0,0 +1,144 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg, Count, Sum
+from reviews.models import Review, Title, TitleScore
+
+
+@pytest.fixture
+def titles():
+    return (
+        Title.objects.create(name='Война и мир', year=1869),
+        Title.objects.create(name='Анна Каренина', year=1877),
+    )
+
+
+def get_rating(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+def expected_rating(title):
+    """Рейтинг, посчитанный агрегатом по отзывам."""
+    aggregate = Review.objects.filter(title=title).aggregate(
+        total=Sum('score'), count=Count('pk'), average=Avg('score')
+    )
+    return aggregate['total'] or 0, aggregate['count'], aggregate['average']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleRating:
+
+    def test_01_create(self, titles, user, admin, user_client):
+        title, _ = titles
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Хорошо', 'score': 8}, format='json',
+        )
+        assert response.status_code == 201
+        Review.objects.create(title=title, author=admin, text='Так', score=5)
+        assert get_rating(title) == (13, 2, 6.5) == expected_rating(title)
+        response = user_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 6.5, (
+            'Рейтинг произведения должен браться из сохранённого значения.'
+        )
+
+    def test_02_score_change(self, titles, user, admin):
+        title, other = titles
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=8
+        )
+        Review.objects.create(title=title, author=admin, text='Так', score=4)
+        review.score = 2
+        review.save()
+        assert get_rating(title) == (6, 2, 3.0) == expected_rating(title)
+
+        review.title = other
+        review.save()
+        assert get_rating(title) == (4, 1, 4.0) == expected_rating(title)
+        assert get_rating(other) == (2, 1, 2.0) == expected_rating(other), (
+            'Перенос отзыва должен переносить оценку между произведениями.'
+        )
+
+        stale = Review.objects.only('id', 'text').get(pk=review.pk)
+        stale.score = 10
+        stale.save()
+        assert get_rating(other) == (10, 1, 10.0) == expected_rating(other)
+
+    def test_03_delete(self, titles, user, admin, admin_client):
+        title, _ = titles
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=8
+        )
+        Review.objects.create(title=title, author=admin, text='Так', score=4)
+        response = admin_client.delete(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        )
+        assert response.status_code == 204
+        assert get_rating(title) == (4, 1, 4.0)
+        Review.objects.all().delete()
+        assert get_rating(title) == (0, 0, None), (
+            'Без отзывов рейтинг произведения должен быть пустым.'
+        )
+
+    def test_04_author_cascade(self, titles, user, admin):
+        title, _ = titles
+        Review.objects.create(title=title, author=user, text='Да', score=8)
+        Review.objects.create(title=title, author=admin, text='Нет', score=4)
+        user.delete()
+        assert get_rating(title) == (4, 1, 4.0) == expected_rating(title)
+
+    def test_05_title_cascade(self, titles, user):
+        title, other = titles
+        Review.objects.create(title=title, author=user, text='Да', score=8)
+        Review.objects.create(title=other, author=user, text='Да', score=6)
+        title.delete()
+        assert not Review.objects.filter(title_id=title.id).exists()
+        assert get_rating(other) == (6, 1, 6.0)
+
+    def test_06_rebuild(self, titles, user, admin):
+        title, other = titles
+        Review.objects.create(title=title, author=user, text='Да', score=9)
+        Review.objects.create(title=title, author=admin, text='Нет', score=2)
+        Title.objects.update(rating_sum=100, rating_count=7, rating=1.0)
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert get_rating(title) == expected_rating(title) == (11, 2, 5.5)
+        assert get_rating(other) == expected_rating(other) == (0, 0, None)
+
+    def test_07_stale_title(self, titles, user, admin_client):
+        title, _ = titles
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=user, text='Да', score=8)
+        stale.name = 'Анна Каренина'
+        stale.save()
+        assert get_rating(title) == (8, 1, 8.0), (
+            'Сохранение произведения не должно перезаписывать рейтинг '
+            'значениями, загруженными до нового отзыва.'
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', {'year': 1877}, format='json'
+        )
+        assert response.status_code == 200
+        assert get_rating(title) == (8, 1, 8.0)
+
+    def test_08_stale_review(self, titles, user):
+        title, _ = titles
+        review = Review.objects.create(
+            title=title, author=user, text='Да', score=5
+        )
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        assert get_rating(title) == (9, 1, 9.0) == expected_rating(title), (
+            'Разница оценок должна считаться от оценки в базе, а не от '
+            'загруженной в память.'
+        )
+        assert dict(
+            TitleScore.objects.filter(title=title, count__gt=0).values_list(
+                'score', 'count'
+            )
+        ) == {9: 1}
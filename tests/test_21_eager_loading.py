@@ -0,0 +1,104 @@
+import pytest
+from api.mixins import get_eager_loading
+from api.serializers import (AdminSerializer, ReviewsSerializer,
+                             TitleReciveSerializer)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return len(context.captured_queries)
+
+
+def add_titles(count, start=0):
+    category = Category.objects.get_or_create(name='Фильм', slug='films')[0]
+    genres = [
+        Genre.objects.get_or_create(name=slug, slug=slug)[0]
+        for slug in ('drama', 'comedy')
+    ]
+    for number in range(start, start + count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    return title
+
+
+def add_reviews(title, count, start=0):
+    for number in range(start, start + count):
+        author = User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Текст', score=5
+        )
+        Comment.objects.create(review=review, author=author, text='Да')
+    return review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21EagerLoading:
+
+    def test_01_serializer_fields(self):
+        select, prefetch, columns = get_eager_loading(
+            Title, TitleReciveSerializer().fields
+        )
+        assert select == ['category']
+        assert [item.prefetch_to for item in prefetch] == ['genre']
+        assert {'name', 'year', 'rating', 'category'} <= columns
+
+        select, prefetch, columns = get_eager_loading(
+            Review, ReviewsSerializer().fields
+        )
+        assert select == ['author']
+        assert not prefetch
+        assert 'author__username' in columns
+        assert 'author__bio' not in columns, (
+            'Из связанной таблицы должны читаться только нужные колонки.'
+        )
+
+        assert get_eager_loading(User, AdminSerializer().fields)[:2] == (
+            [], []
+        )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+        '/api/v1/users/',
+    ])
+    def test_02_list_queries_constant(self, admin_client, url):
+        title = add_titles(1)
+        review = add_reviews(title, 1)
+        urls = {'title': title.id, 'review': review.id}
+        few = count_queries(admin_client, url.format(**urls))
+        add_titles(4, start=1)
+        add_reviews(title, 4, start=1)
+        Comment.objects.bulk_create(
+            Comment(review=review, author=review.author, text='Ещё')
+            for _ in range(4)
+        )
+        many = count_queries(admin_client, url.format(**urls))
+        assert few == many, (
+            f'Число запросов к `{url}` не должно зависеть от количества '
+            f'записей на странице: {few} и {many}.'
+        )
+
+    def test_03_title_detail(self, client):
+        title = add_titles(1)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'drama', 'comedy'
+        ]
+        assert len(context.captured_queries) == 2, (
+            'Карточка произведения должна читаться запросом с категорией '
+            'и запросом жанров.'
+        )
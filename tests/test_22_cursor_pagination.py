@@ -0,0 +1,106 @@
+import pytest
+from django.utils import timezone
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+
+def walk(client, url):
+    """Проходим все страницы по ссылкам next, возвращаем страницы."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        data = response.json()
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+def ids(page):
+    return [item['id'] for item in page['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22CursorPagination:
+
+    def test_01_titles_walk(self, client):
+        created = [
+            Title.objects.create(name=f'Произведение {number}', year=2000).id
+            for number in range(12)
+        ]
+        pages = walk(client, '/api/v1/titles/?cursor=')
+        assert [len(page['results']) for page in pages] == [5, 5, 2]
+        assert sum(map(ids, pages), []) == created, (
+            'Проход по курсору должен вернуть все произведения по порядку '
+            'без пропусков и повторов.'
+        )
+        assert 'count' not in pages[0], (
+            'Курсорная пагинация не должна считать COUNT(*).'
+        )
+        assert pages[0]['previous'] is None
+        assert pages[-1]['next'] is None
+
+    def test_02_previous(self, client):
+        for number in range(12):
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+        pages = walk(client, '/api/v1/titles/?cursor=')
+        response = client.get(pages[2]['previous'])
+        assert ids(response.json()) == ids(pages[1]), (
+            'Ссылка previous должна возвращать предыдущую страницу.'
+        )
+        response = client.get(response.json()['previous'])
+        assert ids(response.json()) == ids(pages[0])
+        assert response.json()['previous'] is None
+
+    def test_03_insert_during_walk(self, client):
+        for number in range(7):
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+        first = client.get('/api/v1/titles/?cursor=').json()
+        Title.objects.filter(id=ids(first)[0]).delete()
+        added = Title.objects.create(name='Новое', year=2000)
+        second = client.get(first['next']).json()
+        assert ids(second)[-1] == added.id
+        assert not set(ids(first)) & set(ids(second)), (
+            'Изменения между страницами не должны сдвигать курсор.'
+        )
+
+    def test_04_reviews_same_pub_date(self, client):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for number in range(8):
+            author = User.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='Да')
+        moment = timezone.now()
+        Review.objects.update(pub_date=moment)
+        Comment.objects.update(pub_date=moment, review=review)
+        pages = walk(client, f'/api/v1/titles/{title.id}/reviews/?cursor=')
+        assert sorted(sum(map(ids, pages), [])) == sorted(
+            Review.objects.values_list('id', flat=True)
+        ), 'Отзывы с одинаковой датой должны упорядочиваться по id.'
+        pages = walk(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/?cursor=',
+        )
+        assert sum(map(ids, pages), []) == sorted(
+            Comment.objects.values_list('id', flat=True)
+        )
+
+    @pytest.mark.parametrize('cursor', ['abc', 'e30', 'eyJwIjpbXX0', '!!!'])
+    def test_05_invalid_cursor(self, client, cursor):
+        response = client.get(f'/api/v1/titles/?cursor={cursor}')
+        assert response.status_code == 404, (
+            'Неверный курсор должен возвращать 404.'
+        )
+
+    def test_06_page_numbers_kept(self, client):
+        for number in range(7):
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+        data = client.get('/api/v1/titles/?page=2').json()
+        assert data['count'] == 7, (
+            'Без параметра cursor должна работать пагинация по номерам.'
+        )
+        assert len(data['results']) == 2
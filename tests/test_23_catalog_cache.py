@@ -0,0 +1,97 @@
+import pytest
+from api.cache import TITLES, get_versions, title_entity
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Review, Title
+
+URL_TITLES = '/api/v1/titles/'
+
+
+def get_titles(client, url=URL_TITLES):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), len(context.captured_queries)
+
+
+def names(data):
+    return [title['name'] for title in data['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CatalogCache:
+
+    def test_01_cached_list(self, client):
+        Title.objects.create(name='Война и мир', year=1869)
+        first, _ = get_titles(client)
+        second, queries = get_titles(client)
+        assert second == first
+        assert queries == 0, (
+            'Повторный запрос списка произведений должен отдаваться из кэша.'
+        )
+
+    def test_02_write_invalidates(self, client, admin_client):
+        category = Category.objects.create(name='Книга', slug='books')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Война и мир', year=1869)
+        get_titles(client)
+        response = admin_client.post(URL_TITLES, {
+            'name': 'Анна Каренина', 'year': 1877,
+            'category': 'books', 'genre': ['drama'],
+        }, format='json')
+        assert response.status_code == 201
+        data, _ = get_titles(client)
+        assert names(data) == ['Война и мир', 'Анна Каренина'], (
+            'Создание произведения должно сбрасывать кэш списка.'
+        )
+
+        title.genre.add(genre)
+        title.category = category
+        title.save()
+        detail, _ = get_titles(client, f'{URL_TITLES}{title.id}/')
+        category.name = 'Роман'
+        category.save()
+        data, _ = get_titles(client, f'{URL_TITLES}{title.id}/')
+        assert data['category']['name'] == 'Роман', (
+            'Изменение категории должно сбрасывать кэш произведений.'
+        )
+        genre.delete()
+        data, _ = get_titles(client, f'{URL_TITLES}{title.id}/')
+        assert data['genre'] == []
+
+    def test_03_rating_invalidates_detail(self, client, user):
+        title = Title.objects.create(name='Война и мир', year=1869)
+        url = f'{URL_TITLES}{title.id}/'
+        assert get_titles(client, url)[0]['rating'] is None
+        Review.objects.create(title=title, author=user, text='Да', score=7)
+        assert get_titles(client, url)[0]['rating'] == 7, (
+            'Новый отзыв должен сбрасывать кэш карточки произведения.'
+        )
+
+    def test_04_bump_after_commit(self, client):
+        title = Title.objects.create(name='Война и мир', year=1869)
+        entities = (TITLES, title_entity(title.id))
+        before = get_versions(*entities)
+        with transaction.atomic():
+            title.name = 'Война и мир. Том 1'
+            title.save()
+            assert get_versions(*entities) == before, (
+                'Версии кэша должны меняться только после фиксации '
+                'транзакции, иначе параллельный запрос закэширует '
+                'незафиксированные данные под новой версией.'
+            )
+        after = get_versions(*entities)
+        assert all(new > old for new, old in zip(after, before))
+
+    def test_05_rollback_keeps_versions(self, client):
+        title = Title.objects.create(name='Война и мир', year=1869)
+        cached, _ = get_titles(client)
+        before = get_versions(TITLES)
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Title.objects.create(name='Черновик', year=2000)
+                raise RuntimeError
+        assert get_versions(TITLES) == before
+        data, queries = get_titles(client)
+        assert data == cached and queries == 0
+        assert names(data) == [title.name]
@@ -0,0 +1,133 @@
+import csv
+import json
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db.models import Avg
+from reviews.management.commands import load_data
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+MODELS = (User, Category, Genre, Title, Review, Comment)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    source = Path(settings.BASE_DIR) / 'static/data'
+    for file_path in source.glob('*.csv'):
+        shutil.copy(file_path, tmp_path)
+    return tmp_path
+
+
+def count_rows(path, filename):
+    with open(path / filename, encoding='utf-8', newline='') as csv_file:
+        return sum(1 for _ in csv.DictReader(csv_file))
+
+
+def load(path, *args):
+    call_command(
+        'load_data', '--path', str(path), *args, stdout=StringIO()
+    )
+
+
+def snapshot():
+    return [
+        sorted(model.objects.values_list('pk', flat=True))
+        for model in MODELS
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24LoadData:
+
+    def test_01_load(self, data_path):
+        load(data_path, '--batch-size', '7')
+        for filename, model in (
+            ('users.csv', User), ('titles.csv', Title),
+            ('review.csv', Review), ('comments.csv', Comment),
+        ):
+            assert model.objects.count() == count_rows(data_path, filename)
+        assert Title.genre.through.objects.count() == count_rows(
+            data_path, 'genre_title.csv'
+        )
+        assert not (data_path / load_data.CHECKPOINT_NAME).exists()
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year < 2020, (
+            'Дата публикации должна браться из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        average = Review.objects.filter(title=title).aggregate(
+            average=Avg('score')
+        )['average']
+        assert title.rating == pytest.approx(average), (
+            'После загрузки рейтинги должны быть пересчитаны.'
+        )
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        assert user.pk > max(snapshot()[0][:-1]), (
+            'Последовательности id должны быть сдвинуты после загрузки.'
+        )
+
+    def test_02_resume(self, data_path, monkeypatch):
+        load(data_path)
+        expected = snapshot()
+        for model in MODELS:
+            model.objects.all().delete()
+
+        save_batch = load_data.Command.save_batch
+        calls = []
+
+        def interrupted(command, model, batch):
+            if model is Review and len(calls) == 2:
+                raise KeyboardInterrupt
+            if model is Review:
+                calls.append(len(batch))
+            return save_batch(command, model, batch)
+
+        monkeypatch.setattr(load_data.Command, 'save_batch', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            load(data_path, '--batch-size', '10')
+        checkpoint = json.loads(
+            (data_path / load_data.CHECKPOINT_NAME).read_text()
+        )
+        assert checkpoint['titles.csv'] == -1
+        assert checkpoint['review.csv'] == 20
+        assert Review.objects.count() == 20
+
+        monkeypatch.setattr(load_data.Command, 'save_batch', save_batch)
+        load(data_path, '--resume', '--batch-size', '10')
+        assert snapshot() == expected, (
+            'Загрузка с --resume должна продолжиться с контрольной точки '
+            'без пропусков и повторов.'
+        )
+        assert not (data_path / load_data.CHECKPOINT_NAME).exists()
+
+    def test_03_resume_after_uncheckpointed_batch(self, data_path):
+        load(data_path)
+        expected = snapshot()
+        (data_path / load_data.CHECKPOINT_NAME).write_text(
+            json.dumps({'users.csv': 2})
+        )
+        load(data_path, '--resume')
+        assert snapshot() == expected, (
+            'Повторная вставка уже сохранённых строк при --resume '
+            'не должна падать и дублировать записи.'
+        )
+
+    def test_04_broken_references(self, data_path):
+        with open(data_path / 'review.csv', 'a', encoding='utf-8') as file:
+            file.write('\n9001,9999,Нет произведения,1,5,2020-01-01T00:00Z\n')
+            file.write('9002,1,Нет автора,9999,5,2020-01-01T00:00Z\n')
+        load(data_path)
+        assert Review.objects.count() == count_rows(data_path, 'review.csv') - 2
+        assert not Review.objects.filter(pk__in=(9001, 9002)).exists(), (
+            'Строки с битыми внешними ключами должны пропускаться.'
+        )
+
+    def test_05_bad_batch_size(self, data_path):
+        with pytest.raises(CommandError):
+            load(data_path, '--batch-size', '0')
@@ -0,0 +1,125 @@
+import csv
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, Review, Title
+
+URL_EXPORT = '/api/v1/export/{}/'
+
+
+@pytest.fixture
+def catalog(user, admin):
+    category = Category.objects.create(name='Книга', slug='books')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Роман', slug='novel'),
+    ]
+    titles = []
+    for number in range(5):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number,
+            category=category if number % 2 else None,
+        )
+        title.genre.set(genres[:number % 3])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Текст', score=score
+        )
+        for author, score in ((user, 4), (admin, 9))
+    ]
+    Comment.objects.create(review=reviews[0], author=admin, text='Нет')
+    return titles, reviews
+
+
+def export(client, name, **params):
+    response = client.get(URL_EXPORT.format(name), params)
+    assert response.status_code == 200, response
+    assert response.streaming, 'Выгрузка должна отдаваться потоком.'
+    return response, b''.join(response.streaming_content).decode()
+
+
+def ndjson(client, name, **params):
+    response, content = export(client, name, **params)
+    assert response['Content-Type'] == 'application/x-ndjson'
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Exports:
+
+    @pytest.mark.parametrize('name', ['titles', 'reviews', 'comments'])
+    def test_01_admin_only(self, client, user_client, moderator_client,
+                           name):
+        url = URL_EXPORT.format(name)
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403
+        assert moderator_client.get(url).status_code == 403
+
+    def test_02_titles_match_api(self, admin_client, catalog, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        titles, _ = catalog
+        rows = ndjson(admin_client, 'titles')
+        assert [row['id'] for row in rows] == [title.id for title in titles]
+        for row in rows:
+            detail = admin_client.get(f'/api/v1/titles/{row["id"]}/').json()
+            assert row == detail, (
+                'Строка выгрузки должна совпадать с ответом API, в том числе '
+                'на границе порций.'
+            )
+
+    def test_03_parent_ids(self, admin_client, catalog):
+        titles, reviews = catalog
+        rows = ndjson(admin_client, 'reviews')
+        assert [(row['id'], row['title'], row['score']) for row in rows] == [
+            (review.id, titles[0].id, review.score) for review in reviews
+        ]
+        rows = ndjson(admin_client, 'comments')
+        assert [row['review'] for row in rows] == [reviews[0].id]
+        assert rows[0]['author'] == reviews[1].author.username
+
+    def test_04_since(self, admin_client, catalog):
+        titles, reviews = catalog
+        rows = ndjson(admin_client, 'titles', since_id=titles[2].id)
+        assert [row['id'] for row in rows] == [
+            title.id for title in titles[3:]
+        ]
+        Review.objects.filter(pk=reviews[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=2)
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = ndjson(admin_client, 'reviews', since=since)
+        assert [row['id'] for row in rows] == [reviews[1].id]
+
+    @pytest.mark.parametrize('name,params', [
+        ('titles', {'since_id': 'abc'}),
+        ('comments', {'since_id': '²'}),
+        ('titles', {'since': '2020-01-01T00:00:00'}),
+        ('reviews', {'since': 'вчера'}),
+        ('reviews', {'since': '2020-13-45T00:00:00'}),
+    ])
+    def test_05_bad_params(self, admin_client, name, params):
+        response = admin_client.get(URL_EXPORT.format(name), params)
+        assert response.status_code == 400
+
+    def test_06_csv(self, admin_client, catalog):
+        titles, _ = catalog
+        response, content = export(admin_client, 'titles', output='csv')
+        assert response['Content-Type'] == 'text/csv'
+        assert 'filename="titles.csv"' in response['Content-Disposition']
+        rows = list(csv.DictReader(content.splitlines()))
+        assert len(rows) == len(titles)
+        assert {'id', 'name', 'year', 'rating', 'genre', 'category'} <= set(
+            rows[0]
+        )
+        assert json.loads(rows[2]['genre']) == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Роман', 'slug': 'novel'},
+        ], 'Вложенные значения должны записываться в ячейку как JSON.'
+        assert json.loads(rows[1]['category']) == {
+            'name': 'Книга', 'slug': 'books'
+        }
+        response, content = export(admin_client, 'reviews', output='csv')
+        assert next(csv.reader(content.splitlines()))[-1] == 'title'
@@ -0,0 +1,105 @@
+import importlib
+
+import pytest
+from api import search
+from django.core.checks import run_checks
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from reviews.models import Genre, Title
+
+URL_SEARCH = '/api/v1/titles/?search={}'
+fts_migration = importlib.import_module(
+    'reviews.migrations.0032_title_search_fts'
+)
+
+
+@pytest.fixture
+def reset_fts():
+    search._fts_available.clear()
+    yield
+    search._fts_available.clear()
+
+
+def found(client, query):
+    response = client.get(URL_SEARCH.format(query))
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleSearch:
+
+    def test_01_triggers_exist(self, reset_fts):
+        assert search.get_missing_triggers(connection) == []
+        assert search.has_fts('default'), (
+            'После миграций полнотекстовый индекс должен быть доступен.'
+        )
+
+    def test_02_follows_writes(self, client):
+        title = Title.objects.create(
+            name='Война и мир', year=1869, description='Роман-эпопея'
+        )
+        Title.objects.create(name='Мир', year=2000)
+        assert found(client, 'войн') == ['Война и мир']
+        assert found(client, 'эпопея') == ['Война и мир'], (
+            'Поиск должен идти и по описанию.'
+        )
+        assert found(client, 'мир война') == ['Война и мир']
+
+        title.name = 'Анна Каренина'
+        title.description = 'Роман'
+        title.save()
+        assert found(client, 'войн') == []
+        assert found(client, 'карен') == ['Анна Каренина'], (
+            'Индекс должен обновляться при изменении произведения.'
+        )
+        Title.objects.filter(pk=title.pk).update(name='Воскресение')
+        assert found(client, 'воскр') == ['Воскресение']
+
+        title.delete()
+        assert found(client, 'воскр') == [], (
+            'Удалённое произведение не должно находиться поиском.'
+        )
+        assert found(client, 'мир') == ['Мир']
+
+    def test_03_rank_and_filters(self, client):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        Title.objects.create(
+            name='Сад', year=2000,
+            description='Длинное описание, в котором вишня упомянута '
+                        'один раз среди множества других слов и фраз',
+        )
+        first = Title.objects.create(name='Вишня', year=2001)
+        first.genre.add(drama)
+        assert found(client, 'вишня') == ['Вишня', 'Сад'], (
+            'Результаты поиска должны быть упорядочены по релевантности.'
+        )
+        response = client.get(URL_SEARCH.format('вишня') + '&genre=drama')
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == ['Вишня']
+
+    def test_04_missing_trigger(self, client, reset_fts):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {search.FTS_TABLE}_au')
+        try:
+            with pytest.raises(ImproperlyConfigured):
+                search.has_fts('default')
+            errors = run_checks(databases=['default'])
+            assert [error.id for error in errors] == ['api.E001'], (
+                'Проверка системы должна сообщать о потерянных триггерах.'
+            )
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(fts_migration.CREATE_SQL[3])
+        search._fts_available.clear()
+        assert search.has_fts('default')
+        assert run_checks(databases=['default']) == []
+
+    def test_05_without_fts(self, client, reset_fts):
+        search._fts_available['default'] = False
+        Title.objects.create(name='Война и мир', year=1869)
+        Title.objects.create(name='Мир', year=2000)
+        assert found(client, 'ойна') == ['Война и мир'], (
+            'Без FTS5 поиск должен работать через icontains.'
+        )
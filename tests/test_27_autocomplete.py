@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from api.indexes import title_names
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+URL_AUTOCOMPLETE = '/api/v1/titles/autocomplete/'
+
+
+def suggest(client, query, **params):
+    response = client.get(URL_AUTOCOMPLETE, {'q': query, **params})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()]
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=name, year=2000)
+        for name in (
+            'Война и мир', 'Воскресение', 'Вий', 'Анна Каренина',
+            'война  миров',
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Autocomplete:
+
+    def test_01_prefix(self, client, titles):
+        assert suggest(client, 'во') == [
+            'Война и мир', 'война  миров', 'Воскресение'
+        ], 'Подсказки — произведения с этим началом в алфавитном порядке.'
+        assert suggest(client, '  ВОЙНА   М ') == ['война  миров'], (
+            'Регистр и повторные пробелы в запросе не важны.'
+        )
+        assert suggest(client, 'ж') == []
+        response = client.get(URL_AUTOCOMPLETE, {'q': 'вий'})
+        assert response.json() == [{'id': titles[2].id, 'name': 'Вий'}]
+
+    def test_02_no_queries(self, client, titles):
+        suggest(client, 'в')
+        with CaptureQueriesContext(connection) as context:
+            assert suggest(client, 'ан') == ['Анна Каренина']
+        assert not context.captured_queries, (
+            'Подсказки должны строиться из индекса в памяти.'
+        )
+
+    def test_03_limit(self, client, settings):
+        settings.TITLE_AUTOCOMPLETE_LIMIT = 3
+        settings.TITLE_AUTOCOMPLETE_MAX_LIMIT = 5
+        for number in range(8):
+            Title.objects.create(name=f'Том {number}', year=2000)
+        assert len(suggest(client, 'том')) == 3
+        assert suggest(client, 'том', limit=2) == ['Том 0', 'Том 1']
+        assert len(suggest(client, 'том', limit=100)) == 5
+        for limit in ('0', '-1', 'abc', '²', ''):
+            response = client.get(
+                URL_AUTOCOMPLETE, {'q': 'том', 'limit': limit}
+            )
+            assert response.status_code == 400
+        assert suggest(client, '') == []
+
+    def test_04_follows_writes(self, client, titles):
+        suggest(client, 'в')
+        titles[0].name = 'Детство'
+        titles[0].save()
+        Title.objects.create(name='Вишнёвый сад', year=1904)
+        titles[1].delete()
+        assert suggest(client, 'в') == ['Вий', 'Вишнёвый сад', 'война  миров']
+        assert suggest(client, 'дет') == ['Детство'], (
+            'Индекс должен обновляться сигналами при записи.'
+        )
+
+    def test_05_rollback(self, client, titles):
+        suggest(client, 'в')
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Title.objects.create(name='Вечер', year=2000)
+                raise RuntimeError
+        assert 'Вечер' not in suggest(client, 'ве'), (
+            'Откаченные изменения не должны попадать в индекс.'
+        )
+
+    def test_06_background_refresh(self, client, titles, settings):
+        settings.TITLE_INDEX_REFRESH = 0
+        suggest(client, 'в')
+        # Изменение в обход сигналов — как запись из другого процесса.
+        Title.objects.filter(pk=titles[3].pk).update(name='Вишня')
+        deadline = time.monotonic() + 5
+        while 'Вишня' not in suggest(client, 'ви'):
+            assert time.monotonic() < deadline, (
+                'Индекс должен перестраиваться в фоне раз в '
+                'TITLE_INDEX_REFRESH секунд.'
+            )
+            time.sleep(0.05)
+        assert title_names.search('ан', 10) == []
@@ -0,0 +1,164 @@
+import pytest
+from api.cache import CATEGORIES, bump_versions
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+URL_CATEGORIES = '/api/v1/categories/'
+URL_TITLES = '/api/v1/titles/'
+TITLE_DATA = {'name': 'Война и мир', 'year': 1869, 'genre': ['drama']}
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Общий для процессов кэш каталога — файловый."""
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.CATALOG_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+
+
+@pytest.fixture
+def dummy_cache(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.CATALOG_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+
+
+@pytest.fixture
+def references():
+    Genre.objects.create(name='Драма', slug='drama')
+    return Category.objects.create(name='Книга', slug='books')
+
+
+def insert_category(slug):
+    """Запись другого процесса: в обход сигналов этого процесса."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO reviews_category (name, slug) VALUES (%s, %s)',
+            [slug, slug],
+        )
+
+
+def delete_category(slug):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM reviews_category WHERE slug = %s', [slug])
+
+
+def create_title(client, category):
+    return client.post(
+        URL_TITLES, {**TITLE_DATA, 'category': category}, format='json'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ReferenceCache:
+
+    def test_01_etag(self, client, references):
+        response = client.get(URL_CATEGORIES)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(URL_CATEGORIES, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not context.captured_queries, (
+            'Ответ 304 должен отдаваться без обращения к базе.'
+        )
+        Category.objects.create(name='Фильм', slug='films')
+        response = client.get(URL_CATEGORIES, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'После изменения справочника ETag должен смениться.'
+        )
+        assert response['ETag'] != etag
+        assert response.json()['count'] == 2
+
+    def test_02_search(self, client, references):
+        Category.objects.create(name='Фильм', slug='films')
+        response = client.get(URL_CATEGORIES, {'search': 'фил'})
+        assert [row['slug'] for row in response.json()['results']] == [
+            'films'
+        ]
+
+    def test_03_local_cache_reads_database(self, admin_client, references):
+        admin_client.get(URL_CATEGORIES)
+        insert_category('films')
+        response = create_title(admin_client, 'films')
+        assert response.status_code == 201, (
+            'Категорию, созданную другим процессом, нужно искать в базе.'
+        )
+        delete_category('books')
+        response = create_title(admin_client, 'books')
+        assert response.status_code == 400, (
+            'Категория, удалённая другим процессом, не должна находиться '
+            'в копии справочника.'
+        )
+        assert 'category' in response.json()
+
+    def test_04_shared_cache(self, admin_client, references, shared_cache):
+        admin_client.get(URL_CATEGORIES)
+        admin_client.get(URL_TITLES)
+        with CaptureQueriesContext(connection) as context:
+            response = create_title(admin_client, 'books')
+        assert response.status_code == 201
+        assert not any(
+            'reviews_category' in query['sql']
+            for query in context.captured_queries
+        ), 'С общим кэшем слаг категории ищется в копии справочника.'
+
+        insert_category('films')
+        response = create_title(admin_client, 'films')
+        assert response.status_code == 201, (
+            'Слаг, которого нет в копии, нужно искать в базе.'
+        )
+        insert_category('series')
+        bump_versions(CATEGORIES)
+        admin_client.get(URL_CATEGORIES)
+        delete_category('series')
+        bump_versions(CATEGORIES)
+        response = create_title(admin_client, 'series')
+        assert response.status_code == 400, (
+            'Смена версии в общем кэше должна обновлять копию справочника.'
+        )
+
+    def test_05_unknown_slug(self, admin_client, references):
+        response = create_title(admin_client, 'unknown')
+        assert response.status_code == 400
+        assert not Title.objects.exists()
+
+    def test_06_local_cache_expires(self, client, references, settings):
+        etag = client.get(URL_CATEGORIES)['ETag']
+        insert_category('films')
+        response = client.get(URL_CATEGORIES, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        settings.REFERENCE_CACHE_TIMEOUT = 0
+        response = client.get(URL_CATEGORIES, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Копия справочника должна перечитываться из базы не реже '
+            'чем раз в REFERENCE_CACHE_TIMEOUT секунд.'
+        )
+        assert response.json()['count'] == 2
+        assert response['ETag'] != etag
+        response = client.get(
+            URL_CATEGORIES, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert response.status_code == 304, (
+            'Без изменений в базе ETag перечитанной копии не меняется.'
+        )
+
+    def test_07_dummy_cache(self, admin_client, references, dummy_cache):
+        for url in (URL_CATEGORIES, '/api/v1/genres/'):
+            response = admin_client.get(url)
+            assert response.status_code == 200
+            assert response.json()['count'] == 1
+            assert not response.has_header('ETag')
+            assert not response.has_header('Last-Modified')
+        insert_category('films')
+        assert admin_client.get(URL_CATEGORIES).json()['count'] == 2
+        assert create_title(admin_client, 'films').status_code == 201
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+from api.indexes import TitleFacets, bitset
+from django.db.models import Count
+from reviews.models import Category, Genre, Title
+
+URL_FACETS = '/api/v1/titles/facets/'
+FILTERS = {
+    'genre': 'genre__slug__in',
+    'category': 'category__slug__in',
+    'year': 'year',
+}
+
+
+@pytest.fixture
+def catalog():
+    rnd = random.Random(10)
+    categories = [
+        Category.objects.create(name=slug, slug=slug)
+        for slug in ('books', 'films', 'music')
+    ]
+    genres = [
+        Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'horror', 'poem')
+    ]
+    for number in range(30):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number % 4,
+            category=rnd.choice(categories + [None]),
+        )
+        title.genre.set(rnd.sample(genres, rnd.randrange(3)))
+    return categories, genres
+
+
+def get_facets(client, **params):
+    response = client.get(URL_FACETS, params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def expected_facets(**params):
+    """Те же счётчики, посчитанные GROUP BY по базе."""
+    lookups = {
+        facet: params[facet].split(',') if facet != 'year' else params[facet]
+        for facet in FILTERS if facet in params
+    }
+
+    def select(exclude=None):
+        queryset = Title.objects.all()
+        for facet, value in lookups.items():
+            if facet != exclude:
+                queryset = queryset.filter(**{FILTERS[facet]: value})
+        return queryset.distinct()
+
+    result = {'count': select().count()}
+    for facet, column in (
+        ('genre', 'genre__slug'), ('category', 'category__slug'),
+        ('year', 'year'),
+    ):
+        rows = select(facet).exclude(**{f'{column}__isnull': True}).values(
+            column
+        ).annotate(found=Count('id', distinct=True)).order_by(column)
+        result[facet] = {
+            str(row[column]): row['found'] for row in rows
+        }
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleFacets:
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'genre': 'drama'},
+        {'genre': 'drama,comedy', 'year': '2001'},
+        {'category': 'books,music', 'genre': 'horror'},
+        {'year': '2003'},
+        {'genre': 'unknown'},
+    ])
+    def test_01_match_database(self, client, catalog, params):
+        assert get_facets(client, **params) == expected_facets(**params), (
+            'Счётчики фасетов должны совпадать с GROUP BY по базе.'
+        )
+
+    def test_02_name_filter(self, client, catalog):
+        names = 'Произведение 1,Произведение 2,Произведение 3'
+        facets = get_facets(client, name=names)
+        assert facets['count'] == 3
+        assert sum(facets['year'].values()) == 3
+
+    def test_03_follows_writes(self, client, catalog):
+        categories, genres = catalog
+        get_facets(client)
+        title = Title.objects.first()
+        title.category = categories[2]
+        title.year = 1990
+        title.save()
+        title.genre.set(genres[3:])
+        genres[0].titles.clear()
+        Title.objects.last().delete()
+        Title.objects.create(name='Новое', year=1990).genre.add(genres[1])
+        genres[2].delete()
+        for params in ({}, {'year': '1990'}, {'genre': 'poem'}):
+            assert get_facets(client, **params) == expected_facets(
+                **params
+            ), 'Индекс фасетов должен обновляться при записи.'
+
+    def test_04_invalid(self, client):
+        response = client.get(URL_FACETS, {'year': 'abc'})
+        assert response.status_code == 400
+
+    def test_05_build_matches_changes(self):
+        rnd = random.Random(5)
+        rows = []
+        for pk in rnd.sample(range(1, 500), 200):
+            category, year = rnd.choice([1, 2, None]), rnd.choice([1, None])
+            genre_ids = rnd.sample(range(1, 6), rnd.randrange(4))
+            rows += [(pk, category, year, genre) for genre in genre_ids]
+            if not genre_ids:
+                rows.append((pk, category, year, None))
+        rows += rows[:10]
+        built = TitleFacets(rows)
+        changed = TitleFacets([])
+        for pk, category, year, genre in rows:
+            if pk not in changed.titles:
+                changed.save_title(pk, category, year)
+            if genre is not None:
+                changed.add_genres(pk, [genre])
+        assert built.all == changed.all == bitset(pk for pk, *_ in rows)
+        assert built.titles == changed.titles
+        assert built.bitmaps == changed.bitmaps, (
+            'Построение индекса по строкам должно давать те же битовые '
+            'множества, что и поштучные изменения.'
+        )
@@ -0,0 +1,122 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title, TitleScore
+from users.models import User
+
+
+@pytest.fixture
+def titles():
+    return (
+        Title.objects.create(name='Война и мир', year=1869),
+        Title.objects.create(name='Анна Каренина', year=1877),
+    )
+
+
+def make_authors(count):
+    return [
+        User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(count)
+    ]
+
+
+def histogram(title):
+    """Гистограмма из счётчиков, без нулевых оценок."""
+    return {
+        item.score: item.count
+        for item in TitleScore.objects.filter(title=title)
+        if item.count
+    }
+
+
+def expected(title):
+    return dict(Counter(
+        Review.objects.filter(title=title).values_list('score', flat=True)
+    ))
+
+
+def distribution(**counts):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(counts)
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ScoreDistribution:
+
+    def test_01_create_change_delete(self, titles):
+        title, other = titles
+        authors = make_authors(4)
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+            for author, score in zip(authors, (8, 8, 3, 10))
+        ]
+        assert histogram(title) == {8: 2, 3: 1, 10: 1} == expected(title)
+
+        reviews[0].score = 3
+        reviews[0].save()
+        assert histogram(title) == {8: 1, 3: 2, 10: 1} == expected(title)
+
+        reviews[1].title = other
+        reviews[1].save()
+        assert histogram(title) == {3: 2, 10: 1} == expected(title)
+        assert histogram(other) == {8: 1} == expected(other), (
+            'Перенос отзыва должен переносить оценку между гистограммами.'
+        )
+
+        reviews[3].delete()
+        authors[2].delete()
+        assert histogram(title) == {3: 1} == expected(title)
+        title.delete()
+        assert not TitleScore.objects.filter(title_id=title.id).exists()
+
+    def test_02_stats(self, client, titles):
+        title, _ = titles
+        for author, score in zip(make_authors(3), (5, 5, 9)):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+        response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        assert response.json() == {
+            'id': title.id,
+            'rating': pytest.approx(19 / 3),
+            'rating_count': 3,
+            'score_distribution': distribution(**{'5': 2, '9': 1}),
+        }
+
+    def test_03_include(self, client, titles):
+        title, other = titles
+        Review.objects.create(
+            title=title, author=make_authors(1)[0], text='Текст', score=1
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert 'score_distribution' not in response.json(), (
+            'Гистограмма по умолчанию не входит в ответ.'
+        )
+        response = client.get(
+            '/api/v1/titles/', {'include': 'score_distribution'}
+        )
+        results = {row['id']: row for row in response.json()['results']}
+        assert results[title.id]['score_distribution'] == distribution(
+            **{'1': 1}
+        )
+        assert results[other.id]['score_distribution'] == distribution()
+
+    def test_04_rebuild(self, titles):
+        title, other = titles
+        for author, score in zip(make_authors(3), (2, 2, 7)):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+        TitleScore.objects.all().delete()
+        TitleScore.objects.create(title=other, score=4, count=5)
+        call_command('rebuild_score_distribution', stdout=StringIO())
+        assert histogram(title) == {2: 2, 7: 1} == expected(title)
+        assert histogram(other) == {}
@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+URL_BULK = '/api/v1/titles/bulk/'
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Книга', slug='books')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Роман', slug='novel'),
+    ]
+    result = []
+    for number in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres[:number % 3])
+        result.append(title)
+    return result
+
+
+def get_bulk(client, ids, **params):
+    return client.get(
+        URL_BULK, {'ids': ','.join(map(str, ids)), **params}
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TitlesBulk:
+
+    def test_01_order_and_missing(self, client, titles):
+        ids = [titles[3].id, titles[0].id, 9999, titles[3].id, titles[5].id]
+        response = get_bulk(client, ids)
+        assert response.status_code == 200
+        data = response.json()
+        assert [row['id'] for row in data['results']] == [
+            titles[3].id, titles[0].id, titles[5].id
+        ], 'Порядок ответа совпадает с запросом, повторы отбрасываются.'
+        assert data['missing'] == [9999]
+        for row in data['results']:
+            detail = client.get(f'/api/v1/titles/{row["id"]}/').json()
+            assert row == detail
+
+    def test_02_constant_queries(self, client, titles):
+        counts = []
+        for count in (1, 6):
+            with CaptureQueriesContext(connection) as context:
+                response = get_bulk(
+                    client, [title.id for title in titles[:count]]
+                )
+            assert len(response.json()['results']) == count
+            counts.append(len(context.captured_queries))
+        assert counts == [2, 2], (
+            'Произведения с категорией и жанрами должны читаться '
+            'двумя запросами при любом числе id.'
+        )
+
+    @pytest.mark.parametrize('ids', ['', '1,,2', 'a', '1;2', '-1', '²', '1,²'])
+    def test_03_invalid_ids(self, client, ids):
+        response = client.get(URL_BULK, {'ids': ids})
+        assert response.status_code == 400
+        assert 'ids' in response.json()
+
+    def test_04_max_ids(self, client, settings):
+        settings.TITLES_BULK_MAX_IDS = 3
+        assert get_bulk(client, [1, 2, 3]).status_code == 200
+        assert get_bulk(client, [1, 2, 3, 4]).status_code == 400
+        assert get_bulk(client, [1, 1, 2, 2, 3]).status_code == 200, (
+            'Повторы не должны учитываться в ограничении.'
+        )
+        response = get_bulk(client, [1, 2, 3, 4, 'a'])
+        assert response.status_code == 400
+        assert 'больше 3' in response.json()['ids'], (
+            'Ограничение должно проверяться во время разбора списка.'
+        )
+
+    def test_05_cache_invalidated(self, client, titles):
+        ids = [title.id for title in titles[:2]]
+        get_bulk(client, ids)
+        with CaptureQueriesContext(connection) as context:
+            get_bulk(client, ids)
+        assert not context.captured_queries
+        titles[1].name = 'Новое название'
+        titles[1].save()
+        results = get_bulk(client, ids).json()['results']
+        assert results[1]['name'] == 'Новое название'
+
+    def test_06_include(self, client, titles):
+        response = get_bulk(
+            client, [titles[0].id], include='score_distribution'
+        )
+        assert response.json()['results'][0]['score_distribution'] == {
+            str(score): 0 for score in range(1, 11)
+        }
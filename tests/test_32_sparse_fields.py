@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def title(user):
+    category = Category.objects.create(name='Книга', slug='books')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Война и мир', year=1869, category=category,
+        description='Роман-эпопея',
+    )
+    title.genre.add(genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Хорошо', score=9
+    )
+    Comment.objects.create(review=review, author=user, text='Да')
+    return title
+
+
+def get_keys(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200
+    data = response.json()
+    row = data['results'][0] if 'results' in data else data
+    return set(row)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32SparseFields:
+
+    @pytest.mark.parametrize('url,params,expected', [
+        ('/api/v1/titles/', {'fields': 'id,name'}, {'id', 'name'}),
+        ('/api/v1/titles/', {'fields': 'id, rating ,unknown'},
+         {'id', 'rating'}),
+        ('/api/v1/titles/', {'omit': 'description,genre,category'},
+         {'id', 'name', 'year', 'rating'}),
+        ('/api/v1/titles/', {'fields': 'id,name', 'omit': 'name'}, {'id'}),
+        ('/api/v1/titles/', {'fields': 'id,score_distribution'},
+         {'id', 'score_distribution'}),
+        ('/api/v1/categories/', {'fields': 'slug'}, {'slug'}),
+        ('/api/v1/genres/', {'omit': 'slug'}, {'name'}),
+        ('/api/v1/users/', {'fields': 'username,role'},
+         {'username', 'role'}),
+    ])
+    def test_01_fields(self, admin_client, title, url, params, expected):
+        assert get_keys(admin_client, url, **params) == expected
+
+    def test_02_nested_resources(self, client, title):
+        review = Review.objects.get()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert get_keys(client, url, omit='text,last_comment_at') == {
+            'id', 'author', 'score', 'pub_date', 'comment_count'
+        }
+        assert get_keys(
+            client, f'{url}{review.id}/comments/', fields='id,text'
+        ) == {'id', 'text'}
+        assert get_keys(
+            client, f'/api/v1/titles/{title.id}/', fields='name'
+        ) == {'name'}
+
+    def test_03_fewer_queries(self, client, title):
+        def count(**params):
+            with CaptureQueriesContext(connection) as context:
+                client.get('/api/v1/titles/', {'cursor': '', **params})
+            return len(context.captured_queries)
+
+        assert count() == 2
+        assert count(omit='genre') == 1, (
+            'Без поля genre жанры не должны подгружаться отдельным запросом.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/', {'cursor': '', 'fields': 'id,name'})
+        sql = context.captured_queries[0]['sql']
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Из базы должны читаться только колонки запрошенных полей.'
+        )
+
+    def test_04_writes_ignore_params(self, admin_client, title):
+        response = admin_client.post(
+            '/api/v1/titles/?fields=id', {
+                'name': 'Анна Каренина', 'year': 1877,
+                'category': 'books', 'genre': ['drama'],
+            }, format='json',
+        )
+        assert response.status_code == 201, (
+            'Параметры fields и omit действуют только на чтение.'
+        )
+        assert {'name', 'year', 'category', 'genre'} <= set(response.json())